@@ -22,6 +22,19 @@ from .research_agents_enhanced import *
 from .reporting_agents_enhanced import *
 from .supervision_agents import *
 
+# Pipeline data lists that _merge_agent_output_to_pipeline appends to
+_MERGED_LISTS = ("agent_runs", "synthetic_patients", "encounters")
+
+def _copy_merged_outputs(pipeline_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Shallow copy of pipeline data with private copies of the merged outputs"""
+    data = dict(pipeline_data)
+    for key in _MERGED_LISTS:
+        if key in data:
+            data[key] = list(data[key])
+    if "validation_results" in data:
+        data["validation_results"] = dict(data["validation_results"])
+    return data
+
 class EnhancedAgentOrchestrator:
     """
     Comprehensive multi-agent orchestrator implementing the updated architecture
@@ -47,6 +60,14 @@ class EnhancedAgentOrchestrator:
             "explanation_provenance_phase",
             "supervision_phase"
         ]
+        
+        # Trailing review phases, run side by side on private copies of the
+        # pipeline data (see _execute_concurrent_phases)
+        self.concurrent_phases = {
+            "qa_validation_phase",
+            "explanation_provenance_phase",
+            "supervision_phase"
+        }
     
     def _initialize_all_agents(self):
         """Initialize all agents with proper role assignments"""
@@ -227,8 +248,10 @@ class EnhancedAgentOrchestrator:
         }
         
         try:
-            # Execute all phases in sequence
-            for phase_name in self.execution_phases:
+            # Execute the generation phases in sequence
+            sequential_phases = [phase for phase in self.execution_phases
+                                 if phase not in self.concurrent_phases]
+            for phase_name in sequential_phases:
                 phase_result = await self._execute_phase(phase_name, pipeline_data)
                 pipeline_data["phase_results"][phase_name] = phase_result
                 
@@ -238,6 +261,9 @@ class EnhancedAgentOrchestrator:
                     pipeline_data["failure_reason"] = f"Critical failure in {phase_name}"
                     break
             
+            if pipeline_data["overall_status"] == "running":
+                await self._execute_concurrent_phases(pipeline_data)
+            
             if pipeline_data["overall_status"] == "running":
                 pipeline_data["overall_status"] = "completed"
             
@@ -254,6 +280,45 @@ class EnhancedAgentOrchestrator:
             pipeline_data["completed_at"] = datetime.utcnow().isoformat()
             return pipeline_data
     
+    async def _execute_concurrent_phases(self, pipeline_data: Dict[str, Any]):
+        """Run the review phases together, merging their outputs in pipeline order
+        
+        Each phase works on its own copy of the pipeline data, so no phase sees
+        another's partial output and the merged result does not depend on how
+        the tasks interleave.
+        """
+        
+        phase_names = [phase for phase in self.execution_phases
+                       if phase in self.concurrent_phases]
+        merged_lengths = {key: len(pipeline_data.get(key, ())) for key in _MERGED_LISTS}
+        phase_data = {phase_name: _copy_merged_outputs(pipeline_data) for phase_name in phase_names}
+        
+        # _execute_phase catches per-agent failures, so the group only
+        # unwinds on cancellation
+        async with asyncio.TaskGroup() as task_group:
+            tasks = {
+                phase_name: task_group.create_task(
+                    self._execute_phase(phase_name, phase_data[phase_name])
+                )
+                for phase_name in phase_names
+            }
+        
+        for phase_name in phase_names:
+            data = phase_data[phase_name]
+            for key in _MERGED_LISTS:
+                if key in data:
+                    pipeline_data.setdefault(key, []).extend(data[key][merged_lengths[key]:])
+            if "validation_results" in data:
+                pipeline_data.setdefault("validation_results", {}).update(data["validation_results"])
+            
+            phase_result = tasks[phase_name].result()
+            pipeline_data["phase_results"][phase_name] = phase_result
+            
+            if phase_result.get("critical_failure", False):
+                pipeline_data["overall_status"] = "failed"
+                pipeline_data["failure_reason"] = f"Critical failure in {phase_name}"
+                break
+    
     async def _execute_phase(self, phase_name: str, pipeline_data: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a specific phase of the pipeline"""
         
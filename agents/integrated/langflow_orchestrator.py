@@ -6,9 +6,36 @@ import asyncio
 import json
 import uuid
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional
 from .orchestrator import IntegratedAgentOrchestrator
 
+def flow_metadata(flow_definition: Dict[str, Any]) -> Dict[str, Any]:
+    """Summarize a flow definition's graph shape and agent nodes"""
+    
+    nodes = flow_definition.get("nodes", [])
+    return {
+        "node_count": len(nodes),
+        "edge_count": len(flow_definition.get("edges", [])),
+        "parallel_sections": sum(1 for node in nodes if node["type"] == "parallel_group"),
+        # Agent runs recorded per execution: one per agent node plus one per
+        # agent inside each parallel group
+        "agent_count": sum(
+            1 if node["type"] == "agent" else len(node.get("data", {}).get("agents", []))
+            for node in nodes
+            if node["type"] in ("agent", "parallel_group")
+        ),
+        "node_details": [
+            {
+                "id": node["id"],
+                "type": node["type"],
+                "agent_name": node.get("data", {}).get("agent_name", "N/A"),
+                "agent_type": node.get("data", {}).get("agent_type", "N/A")
+            }
+            for node in nodes
+        ]
+    }
+
 class LangflowOrchestrator(IntegratedAgentOrchestrator):
     """Extended orchestrator with Langflow-based visual workflow support"""
     
@@ -17,13 +44,28 @@ class LangflowOrchestrator(IntegratedAgentOrchestrator):
         self.flow_definitions = {}
         self.active_flows = {}
         
-    def register_flow(self, flow_name: str, flow_definition: Dict[str, Any]):
-        """Register a new Langflow-based workflow"""
-        self.flow_definitions[flow_name] = {
-            "definition": flow_definition,
-            "created_at": datetime.utcnow(),
-            "version": "1.0"
+    def register_flow(self, flow_name: str, flow_definition: Dict[str, Any]) -> Dict[str, Any]:
+        """Register a new Langflow-based workflow and return its metadata"""
+        return self.register_flows({flow_name: flow_definition})[flow_name]
+    
+    def register_flows(self, flows: Mapping[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Register several workflows in one update and return their metadata"""
+        # Node lookup, execution order and metadata depend only on the
+        # definition, so they are computed once here rather than per run
+        created_at = datetime.utcnow()
+        entries = {
+            flow_name: {
+                "definition": flow_definition,
+                "nodes_by_id": {node["id"]: node for node in flow_definition.get("nodes", [])},
+                "execution_order": self._calculate_execution_order(flow_definition),
+                "metadata": flow_metadata(flow_definition),
+                "created_at": created_at,
+                "version": "1.0"
+            }
+            for flow_name, flow_definition in flows.items()
         }
+        self.flow_definitions.update(entries)
+        return {flow_name: entry["metadata"] for flow_name, entry in entries.items()}
     
     async def execute_langflow_pipeline(self, flow_name: str, job_id: uuid.UUID, 
                                       request_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -32,7 +74,9 @@ class LangflowOrchestrator(IntegratedAgentOrchestrator):
         if flow_name not in self.flow_definitions:
             raise ValueError(f"Flow '{flow_name}' not found")
         
-        flow_def = self.flow_definitions[flow_name]["definition"]
+        registered = self.flow_definitions[flow_name]
+        flow_def = registered["definition"]
+        nodes_by_id = registered["nodes_by_id"]
         
         # Initialize flow execution context
         flow_context = {
@@ -40,6 +84,7 @@ class LangflowOrchestrator(IntegratedAgentOrchestrator):
             "flow_name": flow_name,
             "request_data": request_data,
             "nodes": flow_def.get("nodes", []),
+            "nodes_by_id": nodes_by_id,
             "edges": flow_def.get("edges", []),
             "execution_state": {},
             "completed_nodes": set(),
@@ -47,10 +92,8 @@ class LangflowOrchestrator(IntegratedAgentOrchestrator):
             "agent_runs": []
         }
         
-        # Execute flow using topological sort of nodes
-        execution_order = self._calculate_execution_order(flow_def)
-        
-        for node_id in execution_order:
+        # Execute flow using the topological order computed at registration
+        for node_id in registered["execution_order"]:
             try:
                 result = await self._execute_flow_node(node_id, flow_context)
                 flow_context["execution_state"][node_id] = result
@@ -65,7 +108,7 @@ class LangflowOrchestrator(IntegratedAgentOrchestrator):
                 flow_context["execution_state"][node_id] = {"error": str(e)}
                 
                 # Check if this is a critical failure
-                if self._is_critical_node(node_id, flow_def):
+                if self._is_critical_node(node_id, nodes_by_id):
                     break
         
         return self._generate_flow_results(flow_context)
@@ -103,8 +146,7 @@ class LangflowOrchestrator(IntegratedAgentOrchestrator):
     async def _execute_flow_node(self, node_id: str, flow_context: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a single node in the flow"""
         
-        nodes = {node["id"]: node for node in flow_context["nodes"]}
-        node = nodes[node_id]
+        node = flow_context["nodes_by_id"][node_id]
         
         node_type = node.get("type", "unknown")
         node_data = node.get("data", {})
@@ -247,11 +289,10 @@ class LangflowOrchestrator(IntegratedAgentOrchestrator):
         
         return True
     
-    def _is_critical_node(self, node_id: str, flow_def: Dict[str, Any]) -> bool:
+    def _is_critical_node(self, node_id: str, nodes_by_id: Dict[str, Dict[str, Any]]) -> bool:
         """Check if a node is marked as critical for execution"""
         
-        nodes = {node["id"]: node for node in flow_def.get("nodes", [])}
-        node = nodes.get(node_id, {})
+        node = nodes_by_id.get(node_id, {})
         
         return node.get("data", {}).get("critical", False)
     
@@ -359,7 +400,7 @@ class LangflowOrchestrator(IntegratedAgentOrchestrator):
         }
 
 # Predefined Langflow templates
-LANGFLOW_TEMPLATES = {
+_LANGFLOW_TEMPLATES = {
     "comprehensive_ehr": {
         "name": "Comprehensive EHR Generation",
         "description": "Full pipeline with all agent categories",
@@ -433,4 +474,7 @@ LANGFLOW_TEMPLATES = {
             {"source": "quality_gate", "target": "trust_report"}
         ]
     }
-}
\ No newline at end of file
+}
+
+# Read-only view so callers cannot add or replace templates at runtime
+LANGFLOW_TEMPLATES = MappingProxyType(_LANGFLOW_TEMPLATES)
@@ -8,6 +8,7 @@ import uuid
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, asdict
+import numpy as np
 from .orchestrator import IntegratedAgentOrchestrator
 
 @dataclass
@@ -35,6 +36,49 @@ class MindMapNode:
     outputs: Dict[str, Any]
     status: str
 
+class MindMapIndex:
+    """Flat CSR adjacency over a mind map for iterative subtree walks"""
+    
+    def __init__(self, mind_map: Dict[str, Dict[str, Any]]):
+        # Dense integer index per node id; unknown child ids are dropped
+        self.node_ids: List[str] = list(mind_map)
+        self.index_of: Dict[str, int] = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        
+        child_lists = [
+            [self.index_of[child_id] for child_id in mind_map[node_id].get("children", []) if child_id in self.index_of]
+            for node_id in self.node_ids
+        ]
+        counts = np.fromiter((len(children) for children in child_lists), dtype=np.uint32, count=len(child_lists))
+        self.children_offsets = np.zeros(len(child_lists) + 1, dtype=np.uint32)
+        np.cumsum(counts, out=self.children_offsets[1:])
+        self.children_flat = np.fromiter(
+            (child for children in child_lists for child in children),
+            dtype=np.uint32,
+            count=int(self.children_offsets[-1])
+        )
+    
+    def subtree(self, node_id: str) -> List[str]:
+        """Node ids of the subtree rooted at node_id in depth-first pre-order, each listed once"""
+        root = self.index_of.get(node_id)
+        if root is None:
+            return []
+        
+        offsets = self.children_offsets
+        children_flat = self.children_flat
+        visited = bytearray(len(self.node_ids))
+        order = []
+        stack = [root]
+        while stack:
+            current = stack.pop()
+            if visited[current]:
+                continue
+            visited[current] = 1
+            order.append(current)
+            # Push children reversed so they are visited in declaration order
+            stack.extend(children_flat[offsets[current]:offsets[current + 1]][::-1].tolist())
+        
+        return [self.node_ids[i] for i in order]
+
 class MindMapOrchestrator(IntegratedAgentOrchestrator):
     """Enhanced orchestrator with chain-of-thought logging and mind map generation"""
     
@@ -120,6 +120,10 @@ class IntegratedAgentOrchestrator:
         
         return pipeline_data
     
+    def expected_agent_count(self, request_data: Dict[str, Any]) -> int:
+        """Number of agent runs execute_pipeline will record for a request"""
+        return len(self._build_optimal_sequence(request_data))
+    
     def _build_optimal_sequence(self, request_data: Dict[str, Any]) -> List[Tuple[str, str]]:
         """Build optimal agent execution sequence based on request"""
         
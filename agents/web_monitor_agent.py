@@ -51,7 +51,7 @@ class ScrapedContent:
         if self.metadata is None:
             self.metadata = {}
         if not self.content_hash:
-            self.content_hash = hashlib.md5(self.content.encode()).hexdigest()
+            self.content_hash = hashlib.sha256(self.content.encode()).hexdigest()
 
 class WebMonitorAgent:
     """Agent responsible for monitoring web sources and curating data"""
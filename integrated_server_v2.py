@@ -4,24 +4,36 @@ Simplified integration of your multi-agent backend with the existing platform
 """
 
 import os
-import uuid
 import json
+import uuid
+import atexit
 import asyncio
 import sqlite3
-from datetime import datetime
+import threading
+import time
+from itertools import groupby
+from operator import itemgetter
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import Session
 import uvicorn
+import anyio
+
+try:
+    import orjson
+except ImportError:  # stdlib json fallback; same wire format, just slower
+    orjson = None
 
 # Import the integrated orchestrator
 from agents.integrated.orchestrator import IntegratedAgentOrchestrator
-from agents.integrated.langflow_orchestrator import LangflowOrchestrator, LANGFLOW_TEMPLATES
-from agents.integrated.mind_map_orchestrator import MindMapOrchestrator, demonstrate_ckd_diabetes_cohort
+from agents.integrated.langflow_orchestrator import LangflowOrchestrator, LANGFLOW_TEMPLATES, flow_metadata
+from agents.integrated.mind_map_orchestrator import MindMapIndex, MindMapOrchestrator, demonstrate_ckd_diabetes_cohort
 
 # Request/Response models
 class IntegratedGenerationRequest(BaseModel):
@@ -41,15 +53,95 @@ class IntegratedJobStatus(BaseModel):
     result_summary: Optional[Dict[str, Any]] = None
     agent_runs: List[Dict[str, Any]] = []
 
+# Connection tuning applied once when the shared connection is opened
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Per-request SQL, kept as module constants so every call reuses the
+# connection's prepared-statement cache
+_SQL_INSERT_JOB = "INSERT INTO jobs (id, request_payload, status, started_at_us, expected_agent_count) VALUES (?, ?, ?, ?, ?)"
+_SQL_UPDATE_JOB_COMPLETED = "UPDATE jobs SET status = ?, ended_at_us = ?, result_summary = ? WHERE id = ?"
+_SQL_UPDATE_JOB_STATUS = "UPDATE jobs SET status = ? WHERE id = ?"
+_SQL_START_JOB = "UPDATE jobs SET status = 'running' WHERE id = ? AND status = 'pending' RETURNING id"
+_SQL_GET_JOB = "SELECT id, request_payload, status, started_at_us, ended_at_us, result_summary FROM jobs WHERE id = ?"
+_SQL_GET_JOB_META = "SELECT id, status, started_at_us, ended_at_us, expected_agent_count FROM jobs WHERE id = ?"
+_SQL_GET_RESULT_SUMMARY = "SELECT result_summary FROM jobs WHERE id = ?"
+_SQL_INSERT_AGENT_RUN = "INSERT INTO agent_runs (id, job_id, agent_name, agent_type, status, execution_time_ms, ran_at) VALUES (?, ?, ?, ?, ?, ?, ?)"
+_SQL_GET_AGENT_RUNS = "SELECT agent_name, agent_type, status, execution_time_ms, ran_at FROM agent_runs WHERE job_id = ? ORDER BY ran_at DESC LIMIT ? OFFSET ?"
+_SQL_PROGRESS_SNAPSHOT = """
+    SELECT
+        (SELECT COUNT(*) FROM agent_runs WHERE job_id = ?1 AND status IN ('success', 'completed')),
+        (SELECT agent_name FROM agent_runs WHERE job_id = ?1 ORDER BY ran_at DESC LIMIT 1)
+"""
+_SQL_JOB_STATUS_COUNTS = "SELECT status, count FROM job_status_rollup WHERE count > 0"
+_SQL_AGENT_TYPE_COUNT = "SELECT COUNT(DISTINCT agent_type) FROM agent_rollup WHERE count > 0"
+_SQL_ANALYTICS_GROUP = """
+    SELECT
+        agent_type,
+        agent_name,
+        SUM(count) AS total,
+        SUM(CASE WHEN status IN ('success', 'completed') THEN count ELSE 0 END) AS successful,
+        CAST(SUM(total_time_ms) AS REAL) / SUM(count) AS avg_time
+    FROM agent_rollup
+    WHERE count > 0
+    GROUP BY agent_type, agent_name
+    ORDER BY agent_type, agent_name
+"""
+
+def _json_default(value: Any) -> Any:
+    """Match orjson's handling of datetimes and other non-JSON types"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def _dump_json(value: Any) -> bytes:
+    """Encode a JSON column value; orjson bytes are stored as-is (no str round-trip)"""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, separators=(",", ":"), default=_json_default).encode()
+
+_load_json = orjson.loads if orjson is not None else json.loads
+
+# Job timestamps are stored as integer microseconds since the Unix epoch (UTC)
+_EPOCH = datetime(1970, 1, 1)
+
+def _now_us() -> int:
+    """Current UTC time in epoch microseconds"""
+    return time.time_ns() // 1000
+
+def _from_epoch_us(value: int) -> datetime:
+    """Naive UTC datetime for an epoch-microsecond timestamp"""
+    return _EPOCH + timedelta(microseconds=value)
+
+def _to_epoch_us(value: str) -> int:
+    """Epoch microseconds for a naive UTC ISO timestamp"""
+    delta = datetime.fromisoformat(value) - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+# Statuses after which a job's agents will not run any further
+_TERMINAL_JOB_STATUSES = ("completed", "failed")
+
 # Simple database manager for job tracking
 class SimpleJobManager:
     def __init__(self):
         self.db_path = "integrated_jobs.db"
+        # One long-lived connection shared by the event loop and threadpool
+        # handlers; the lock serializes access to it
+        self._conn = sqlite3.connect(self.db_path, cached_statements=256, check_same_thread=False)
+        for pragma in _SQLITE_PRAGMAS:
+            self._conn.execute(pragma)
+        self._lock = threading.Lock()
+        atexit.register(self._conn.close)
         self.init_db()
     
     def init_db(self):
         """Initialize SQLite database for job tracking"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conn
         conn.execute("""
             CREATE TABLE IF NOT EXISTS jobs (
                 id TEXT PRIMARY KEY,
@@ -57,9 +149,28 @@ class SimpleJobManager:
                 status TEXT,
                 started_at TEXT,
                 ended_at TEXT,
-                result_summary TEXT
+                result_summary TEXT,
+                started_at_us INTEGER,
+                ended_at_us INTEGER,
+                expected_agent_count INTEGER
             )
         """)
+        # Databases created before epoch timestamps get the integer columns
+        # added and backfilled from the legacy ISO text columns once
+        job_columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+        if "started_at_us" not in job_columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN started_at_us INTEGER")
+            conn.execute("ALTER TABLE jobs ADD COLUMN ended_at_us INTEGER")
+            conn.executemany(
+                "UPDATE jobs SET started_at_us = ?, ended_at_us = ? WHERE id = ?",
+                [
+                    (_to_epoch_us(started_at) if started_at else None, _to_epoch_us(ended_at) if ended_at else None, job_id)
+                    for job_id, started_at, ended_at in conn.execute("SELECT id, started_at, ended_at FROM jobs").fetchall()
+                ]
+            )
+        if "expected_agent_count" not in job_columns:
+            # Unknown for older jobs; progress falls back to their status
+            conn.execute("ALTER TABLE jobs ADD COLUMN expected_agent_count INTEGER")
         conn.execute("""
             CREATE TABLE IF NOT EXISTS agent_runs (
                 id TEXT PRIMARY KEY,
@@ -72,84 +183,171 @@ class SimpleJobManager:
                 FOREIGN KEY (job_id) REFERENCES jobs (id)
             )
         """)
+        # Job polling filters agent_runs by job and orders by ran_at
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_agent_runs_job_id ON agent_runs (job_id, ran_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)")
+        
+        # Rollup tables maintained on write so analytics never scans the raw tables
+        rollups_exist = conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'agent_rollup'"
+        ).fetchone()[0]
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS agent_rollup (
+                agent_type TEXT,
+                agent_name TEXT,
+                status TEXT,
+                count INTEGER NOT NULL DEFAULT 0,
+                total_time_ms INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (agent_type, agent_name, status)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_status_rollup (
+                status TEXT PRIMARY KEY,
+                count INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS agent_runs_rollup_insert AFTER INSERT ON agent_runs
+            BEGIN
+                INSERT INTO agent_rollup (agent_type, agent_name, status, count, total_time_ms)
+                VALUES (NEW.agent_type, NEW.agent_name, NEW.status, 1, COALESCE(NEW.execution_time_ms, 0))
+                ON CONFLICT (agent_type, agent_name, status) DO UPDATE SET
+                    count = count + excluded.count,
+                    total_time_ms = total_time_ms + excluded.total_time_ms;
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS jobs_rollup_insert AFTER INSERT ON jobs
+            BEGIN
+                INSERT INTO job_status_rollup (status, count) VALUES (NEW.status, 1)
+                ON CONFLICT (status) DO UPDATE SET count = count + 1;
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS jobs_rollup_update AFTER UPDATE OF status ON jobs
+            WHEN OLD.status IS NOT NEW.status
+            BEGIN
+                UPDATE job_status_rollup SET count = count - 1 WHERE status = OLD.status;
+                INSERT INTO job_status_rollup (status, count) VALUES (NEW.status, 1)
+                ON CONFLICT (status) DO UPDATE SET count = count + 1;
+            END
+        """)
+        if not rollups_exist:
+            # Backfill from rows written before the rollups existed
+            conn.execute("""
+                INSERT INTO agent_rollup (agent_type, agent_name, status, count, total_time_ms)
+                SELECT agent_type, agent_name, status, COUNT(*), COALESCE(SUM(execution_time_ms), 0)
+                FROM agent_runs
+                GROUP BY agent_type, agent_name, status
+            """)
+            conn.execute("""
+                INSERT INTO job_status_rollup (status, count)
+                SELECT status, COUNT(*) FROM jobs GROUP BY status
+            """)
         conn.commit()
-        conn.close()
+        # Refresh planner statistics for any newly created indexes
+        conn.execute("PRAGMA optimize")
     
-    def create_job(self, job_id: str, request_data: Dict[str, Any]) -> str:
+    def create_job(self, job_id: str, request_data: Dict[str, Any], expected_agent_count: Optional[int] = None) -> str:
         """Create a new job record"""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute(
-            "INSERT INTO jobs (id, request_payload, status, started_at) VALUES (?, ?, ?, ?)",
-            (job_id, json.dumps(request_data), "pending", datetime.utcnow().isoformat())
-        )
-        conn.commit()
-        conn.close()
+        with self._lock, self._conn:
+            self._conn.execute(
+                _SQL_INSERT_JOB,
+                (job_id, _dump_json(request_data), "pending", _now_us(), expected_agent_count)
+            )
         return job_id
     
     def update_job_status(self, job_id: str, status: str, result_summary: Optional[Dict] = None):
         """Update job status"""
-        conn = sqlite3.connect(self.db_path)
-        if status == "completed":
-            conn.execute(
-                "UPDATE jobs SET status = ?, ended_at = ?, result_summary = ? WHERE id = ?",
-                (status, datetime.utcnow().isoformat(), json.dumps(result_summary) if result_summary else None, job_id)
-            )
-        else:
-            conn.execute(
-                "UPDATE jobs SET status = ? WHERE id = ?",
-                (status, job_id)
+        with self._lock, self._conn:
+            if status == "completed":
+                self._conn.execute(
+                    _SQL_UPDATE_JOB_COMPLETED,
+                    (status, _now_us(), _dump_json(result_summary) if result_summary else None, job_id)
+                )
+            else:
+                self._conn.execute(_SQL_UPDATE_JOB_STATUS, (status, job_id))
+    
+    def start_job(self, job_id: str) -> bool:
+        """Move a pending job to running; False if it was not pending"""
+        with self._lock, self._conn:
+            return self._conn.execute(_SQL_START_JOB, (job_id,)).fetchone() is not None
+    
+    def finalize_job(self, job_id: str, status: str, result_summary: Optional[Dict], agent_runs: List[Dict[str, Any]]):
+        """Write a job's agent runs and final status in a single transaction"""
+        rows = self._agent_run_rows(job_id, agent_runs)
+        with self._lock, self._conn:
+            self._conn.executemany(_SQL_INSERT_AGENT_RUN, rows)
+            self._conn.execute(
+                _SQL_UPDATE_JOB_COMPLETED,
+                (status, _now_us(), _dump_json(result_summary) if result_summary else None, job_id)
             )
-        conn.commit()
-        conn.close()
     
     def get_job(self, job_id: str) -> Optional[Dict]:
         """Get job by ID"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.execute(
-            "SELECT id, request_payload, status, started_at, ended_at, result_summary FROM jobs WHERE id = ?",
-            (job_id,)
-        )
-        row = cursor.fetchone()
-        conn.close()
+        with self._lock:
+            row = self._conn.execute(_SQL_GET_JOB, (job_id,)).fetchone()
         
         if row:
             return {
                 "id": row[0],
-                "request_payload": json.loads(row[1]) if row[1] else {},
+                "request_payload": _load_json(row[1]) if row[1] else {},
                 "status": row[2],
                 "started_at": row[3],
                 "ended_at": row[4],
-                "result_summary": json.loads(row[5]) if row[5] else None
+                "result_summary": _load_json(row[5]) if row[5] else None
             }
         return None
     
-    def add_agent_run(self, job_id: str, agent_run: Dict[str, Any]):
-        """Add agent run record"""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute(
-            "INSERT INTO agent_runs (id, job_id, agent_name, agent_type, status, execution_time_ms, ran_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+    def _agent_run_rows(self, job_id: str, agent_runs: List[Dict[str, Any]]) -> List[tuple]:
+        """Build agent_runs insert rows in one pass"""
+        now = datetime.utcnow().isoformat()
+        return [
             (
-                str(uuid.uuid4()),
+                uuid.uuid4().hex,
                 job_id,
-                agent_run.get("agent_name", "unknown"),
-                agent_run.get("agent_type", "unknown"),
-                agent_run.get("status", "unknown"),
-                agent_run.get("execution_time_ms", 0),
-                agent_run.get("ran_at", datetime.utcnow()).isoformat() if isinstance(agent_run.get("ran_at"), datetime) else str(agent_run.get("ran_at", datetime.utcnow()))
+                run.get("agent_name", "unknown"),
+                run.get("agent_type", "unknown"),
+                run.get("status", "unknown"),
+                int(run.get("execution_time_ms") or 0),
+                ran_at.isoformat() if isinstance(ran_at := run.get("ran_at"), datetime) else (str(ran_at) if ran_at else now)
             )
-        )
-        conn.commit()
-        conn.close()
-    
-    def get_agent_runs(self, job_id: str) -> List[Dict]:
-        """Get agent runs for a job"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.execute(
-            "SELECT agent_name, agent_type, status, execution_time_ms, ran_at FROM agent_runs WHERE job_id = ? ORDER BY ran_at",
-            (job_id,)
-        )
-        rows = cursor.fetchall()
-        conn.close()
+            for run in agent_runs
+        ]
+    
+    def get_job_meta(self, job_id: str) -> Optional[Dict]:
+        """Get a job's status and timestamps without reading its JSON columns"""
+        with self._lock:
+            row = self._conn.execute(_SQL_GET_JOB_META, (job_id,)).fetchone()
+        
+        if row:
+            return {
+                "id": row[0],
+                "status": row[1],
+                "started_at": row[2],
+                "ended_at": row[3],
+                "expected_agent_count": row[4]
+            }
+        return None
+    
+    def get_result_summary(self, job_id: str) -> Optional[Dict]:
+        """Get only a job's parsed result summary"""
+        with self._lock:
+            row = self._conn.execute(_SQL_GET_RESULT_SUMMARY, (job_id,)).fetchone()
+        return _load_json(row[0]) if row and row[0] else None
+    
+    def get_agent_runs(self, job_id: str, limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """Get agent runs for a job, optionally one page at a time
+
+        Pages count back from the most recent run (offset 0 is the newest page);
+        each page is returned oldest first.
+        """
+        # SQLite treats a negative LIMIT as unbounded
+        with self._lock:
+            rows = self._conn.execute(
+                _SQL_GET_AGENT_RUNS, (job_id, -1 if limit is None else limit, offset)
+            ).fetchall()
         
         return [
             {
@@ -159,23 +357,115 @@ class SimpleJobManager:
                 "execution_time_ms": row[3],
                 "ran_at": row[4]
             }
-            for row in rows
+            for row in reversed(rows)
         ]
+    
+    def get_progress_snapshot(self, job_id: str):
+        """Get the completed-run count and latest agent name for a job in one round-trip"""
+        with self._lock:
+            completed, latest_agent = self._conn.execute(_SQL_PROGRESS_SNAPSHOT, (job_id,)).fetchone()
+        return completed, latest_agent
+    
+    def get_platform_overview(self):
+        """Get job status counts and the number of agent types with runs"""
+        with self._lock:
+            job_stats = dict(self._conn.execute(_SQL_JOB_STATUS_COUNTS).fetchall())
+            agent_type_count = self._conn.execute(_SQL_AGENT_TYPE_COUNT).fetchone()[0]
+        return job_stats, agent_type_count
+    
+    def iter_agent_performance(self, batch_size: int = 1000):
+        """Yield per-agent rollup rows, ordered by type, one fetchmany batch at a time"""
+        # The lock is only held per batch so writers are not blocked while a
+        # response is streaming
+        with self._lock:
+            cursor = self._conn.execute(_SQL_ANALYTICS_GROUP)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
+    
+    def close(self):
+        """Close the shared connection"""
+        with self._lock:
+            self._conn.close()
+
+# Handler convention: endpoints doing synchronous (blocking) DB work are plain
+# ``def`` so Starlette runs them on its threadpool; only handlers that await
+# non-blocking I/O are ``async def``. Background pipelines and the generate
+# endpoints must stay coroutines (they touch the asyncio job queue), so they
+# hand their job_manager calls to asyncio.to_thread instead.
+THREADPOOL_TOKENS = int(os.getenv("THREADPOOL_TOKENS", "64"))
+
+# Generation pipelines run on a bounded pool of queue workers rather than as
+# unbounded per-request background tasks
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "4"))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "256"))
+
+async def pipeline_worker(job_queue: asyncio.Queue):
+    """Run queued pipeline coroutines one at a time"""
+    while True:
+        pipeline, args = await job_queue.get()
+        try:
+            await pipeline(*args)
+        except Exception as e:
+            print(f"Error in queued pipeline {pipeline.__name__}: {e}")
+        finally:
+            job_queue.task_done()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build orchestrators and job storage once per worker, after startup"""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_TOKENS
+    
+    app.state.job_manager = SimpleJobManager()
+    app.state.orchestrator = IntegratedAgentOrchestrator()
+    app.state.langflow_orchestrator = LangflowOrchestrator()
+    app.state.mindmap_orchestrator = MindMapOrchestrator()
+    
+    # Demo mind map is static; build it and its adjacency index once
+    app.state.demo_mindmap = demonstrate_ckd_diabetes_cohort()
+    app.state.demo_mindmap_index = MindMapIndex(app.state.demo_mindmap["mind_map"])
+    
+    # Register predefined Langflow templates
+    app.state.langflow_orchestrator.register_flows(LANGFLOW_TEMPLATES)
+    
+    app.state.job_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    workers = [
+        asyncio.create_task(pipeline_worker(app.state.job_queue))
+        for _ in range(PIPELINE_WORKERS)
+    ]
+    
+    yield
+    
+    for worker in workers:
+        worker.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    app.state.job_manager.close()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Synthetic Ascension - Integrated Platform V2",
     description="Your comprehensive multi-agent backend integrated with the existing EHR platform",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse,
+    lifespan=lifespan
 )
 
-# Add CORS middleware
+# Add CORS middleware, restricted to the configured frontend origins and the
+# only verbs this API serves
+ALLOWED_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("ALLOWED_ORIGINS", "http://localhost:5000,http://127.0.0.1:5000").split(",")
+    if origin.strip()
+]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=ALLOWED_ORIGINS,
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type"],
 )
 
 # Initialize Supabase database connection
@@ -186,47 +476,102 @@ else:
     # Fallback to SQLite for development
     engine = create_engine("sqlite:///./leads.db")
 
-# Initialize components
-job_manager = SimpleJobManager()
-orchestrator = IntegratedAgentOrchestrator()
-langflow_orchestrator = LangflowOrchestrator()
-mindmap_orchestrator = MindMapOrchestrator()
+# Invariant parts of the analytics payload, built once rather than per request
+_STATIC_ANALYTICS = {
+    "integration_status": {
+        "cohort_agents": "✅ Integrated",
+        "qa_agents": "✅ Integrated",
+        "research_agents": "✅ Integrated",
+        "reporting_agents": "✅ Integrated",
+        "backend_source": "Your comprehensive multi-agent system"
+    },
+    "capabilities": {
+        "demographic_modeling": True,
+        "clinical_journey_simulation": True,
+        "comorbidity_modeling": True,
+        "medication_planning": True,
+        "lab_generation": True,
+        "vital_signs_generation": True,
+        "statistical_validation": True,
+        "bias_detection": True,
+        "realism_checking": True,
+        "literature_mining": True,
+        "ontology_mapping": True,
+        "fhir_export": True,
+        "audit_trails": True,
+        "trust_scoring": True
+    }
+}
 
-# Register predefined Langflow templates
-for template_name, template_def in LANGFLOW_TEMPLATES.items():
-    langflow_orchestrator.register_flow(template_name, template_def)
+# Agents listed in every /api/v2/generate response
+_AGENTS_TO_EXECUTE = (
+    "Literature Miner", "Ontology Mapper", "Demographic Modeler",
+    "Clinical Journey Simulator", "Comorbidity Modeler", "Medication Planner",
+    "Lab Generator", "Vital Signs Generator", "Statistical Validator",
+    "Bias Auditor", "Realism Checker", "FHIR Exporter", "Trust Report Writer"
+)
+
+# _STATIC_ANALYTICS as the tail of the streamed analytics object
+_STATIC_ANALYTICS_FRAGMENT = b"," + _dump_json(_STATIC_ANALYTICS)[1:]
+
+# Export format name -> URL suffix for /api/v2/jobs/{job_id}/export/{suffix}
+_EXPORT_FORMATS = (
+    ("fhir_bundle", "fhir"),
+    ("csv_export", "csv"),
+    ("audit_trail", "audit"),
+    ("trust_report", "trust"),
+)
+
+_QUEUE_FULL_DETAIL = "Pipeline queue is full, retry later"
+
+def get_job_queue() -> asyncio.Queue:
+    """Return the pipeline queue, rejecting new work while it is saturated"""
+    job_queue = app.state.job_queue
+    if job_queue.full():
+        raise HTTPException(status_code=503, detail=_QUEUE_FULL_DETAIL)
+    return job_queue
+
+async def enqueue_job(job_queue: asyncio.Queue, job_id: str, work: tuple):
+    """Hand a freshly created job to the pipeline workers
+
+    Other requests can fill the queue while the job row is being written, so
+    a job that no longer fits is marked failed rather than left pending.
+    """
+    try:
+        job_queue.put_nowait(work)
+    except asyncio.QueueFull:
+        await asyncio.to_thread(
+            app.state.job_manager.finalize_job, job_id, "failed", {"error": _QUEUE_FULL_DETAIL}, []
+        )
+        raise HTTPException(status_code=503, detail=_QUEUE_FULL_DETAIL)
 
 # Background task executor
-async def execute_generation_pipeline(job_id: str, request: IntegratedGenerationRequest):
+async def execute_generation_pipeline(job_uuid: uuid.UUID, payload: Dict[str, Any]):
     """Execute the complete generation pipeline in background"""
     
+    job_id = job_uuid.hex
     try:
-        job_manager.update_job_status(job_id, "running")
+        # Claim the job in one conditional UPDATE ... RETURNING round-trip
+        if not await asyncio.to_thread(app.state.job_manager.start_job, job_id):
+            return
         
         # Execute the integrated pipeline
-        result = await orchestrator.execute_pipeline(
-            uuid.UUID(job_id), 
-            request.dict(), 
+        result = await app.state.orchestrator.execute_pipeline(
+            job_uuid, 
+            payload, 
             None  # No session needed for simplified version
         )
         
-        # Store agent runs
-        for agent_run in result.get("agent_runs", []):
-            job_manager.add_agent_run(job_id, agent_run)
-        
-        # Update job with results
+        # Store agent runs and results in one transaction
         result_summary = result.get("generation_summary", {})
-        job_manager.update_job_status(job_id, "completed", result_summary)
+        await asyncio.to_thread(app.state.job_manager.finalize_job, job_id, "completed", result_summary, result.get("agent_runs", []))
         
     except Exception as e:
-        job_manager.update_job_status(job_id, "failed", {"error": str(e)})
+        await asyncio.to_thread(app.state.job_manager.update_job_status, job_id, "failed", {"error": str(e)})
         print(f"Error in pipeline execution: {e}")
 
-# API Endpoints
-@app.get("/", response_class=HTMLResponse)
-async def root():
-    """Health check and service information"""
-    return """
+# Static landing page, encoded once and served from the same response object
+_ROOT_HTML = """
     <html>
         <head><title>Synthetic Ascension - Integrated Platform V2</title></head>
         <body style="font-family: Arial, sans-serif; margin: 40px;">
@@ -262,202 +607,203 @@ async def root():
         </body>
     </html>
     """
+_ROOT_HTML_RESPONSE = HTMLResponse(content=_ROOT_HTML, headers={"Cache-Control": "public, max-age=300"})
+
+# API Endpoints
+@app.get("/", response_class=HTMLResponse)
+async def root():
+    """Health check and service information"""
+    return _ROOT_HTML_RESPONSE
 
-@app.post("/api/v2/generate")
-async def generate_comprehensive_cohort(
-    request: IntegratedGenerationRequest,
-    background_tasks: BackgroundTasks
-):
+@app.post("/api/v2/generate", status_code=202)
+async def generate_comprehensive_cohort(request: IntegratedGenerationRequest):
     """Generate comprehensive synthetic EHR data using your integrated multi-agent system"""
     
+    job_queue = get_job_queue()
+    
     # Create job ID and record
-    job_id = str(uuid.uuid4())
-    job_manager.create_job(job_id, request.dict())
-    
-    # Start background generation
-    background_tasks.add_task(
-        execute_generation_pipeline,
-        job_id,
-        request
+    job_uuid = uuid.uuid4()
+    job_id = job_uuid.hex
+    payload = request.model_dump()
+    await asyncio.to_thread(
+        app.state.job_manager.create_job, job_id, payload,
+        app.state.orchestrator.expected_agent_count(payload)
     )
     
+    # Queue background generation with the already-dumped payload
+    await enqueue_job(job_queue, job_id, (execute_generation_pipeline, (job_uuid, payload)))
+    
     return {
         "job_id": job_id,
         "status": "pending",
+        "queue_position": job_queue.qsize(),
         "message": "Your integrated multi-agent pipeline has been started",
         "estimated_completion": "2-5 minutes",
-        "agents_to_execute": [
-            "Literature Miner", "Ontology Mapper", "Demographic Modeler",
-            "Clinical Journey Simulator", "Comorbidity Modeler", "Medication Planner",
-            "Lab Generator", "Vital Signs Generator", "Statistical Validator",
-            "Bias Auditor", "Realism Checker", "FHIR Exporter", "Trust Report Writer"
-        ]
+        "agents_to_execute": _AGENTS_TO_EXECUTE
     }
 
 @app.get("/api/v2/jobs/{job_id}")
-async def get_job_status(job_id: str) -> IntegratedJobStatus:
-    """Get status of your integrated generation job"""
+def get_job_status(job_id: str, detail: bool = True, limit: int = 50, offset: int = 0) -> IntegratedJobStatus:
+    """Get status of your integrated generation job
+
+    ``agent_runs`` holds the ``limit`` most recent runs, skipping the newest
+    ``offset``, in chronological order.
+    """
     
-    job = job_manager.get_job(job_id)
+    job_manager = app.state.job_manager
+    job = job_manager.get_job_meta(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    # Get agent runs
-    agent_runs = job_manager.get_agent_runs(job_id)
+    # Only completed jobs carry a result summary, so in-flight polls never
+    # read or parse the JSON columns
+    result_summary = job_manager.get_result_summary(job_id) if job["status"] == "completed" else None
+    
+    # Progress and current agent are aggregated in SQL; agent runs are only
+    # loaded when the caller asks for detail, one page at a time
+    completed_agents, latest_agent = job_manager.get_progress_snapshot(job_id)
+    agent_runs = job_manager.get_agent_runs(job_id, limit, offset) if detail else []
     
-    # Calculate progress
-    total_expected_agents = 15  # Approximate number of agents in pipeline
-    completed_agents = len([run for run in agent_runs if run["status"] in ["success", "completed"]])
-    progress = min((completed_agents / total_expected_agents) * 100, 100)
+    # Finished jobs are done whatever ran: Langflow flows stop early at condition
+    # nodes and failed agents are not recorded. Running jobs are measured against
+    # the agent count recorded at creation; jobs without one (mind map, legacy
+    # rows) report 0 until they finish
+    expected_agent_count = job["expected_agent_count"]
+    if job["status"] in _TERMINAL_JOB_STATUSES:
+        progress = 100.0
+    elif expected_agent_count:
+        progress = min(completed_agents / expected_agent_count * 100, 100.0)
+    else:
+        progress = 0.0
     
     # Get current agent
-    current_agent = None
-    if job["status"] == "running" and agent_runs:
-        current_agent = agent_runs[-1]["agent_name"]
+    current_agent = latest_agent if job["status"] == "running" else None
     
     return IntegratedJobStatus(
         job_id=job["id"],
         status=job["status"],
-        started_at=datetime.fromisoformat(job["started_at"]),
-        ended_at=datetime.fromisoformat(job["ended_at"]) if job["ended_at"] else None,
+        started_at=_from_epoch_us(job["started_at"]),
+        ended_at=_from_epoch_us(job["ended_at"]) if job["ended_at"] is not None else None,
         progress=progress,
         current_agent=current_agent,
-        result_summary=job["result_summary"],
+        result_summary=result_summary,
         agent_runs=agent_runs
     )
 
 @app.get("/api/v2/analytics")
-async def get_platform_analytics():
+def get_platform_analytics():
     """Get analytics for your integrated platform"""
     
-    conn = sqlite3.connect(job_manager.db_path)
-    
-    # Job statistics
-    cursor = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
-    job_stats = dict(cursor.fetchall())
-    
-    cursor = conn.execute("SELECT COUNT(*) FROM jobs")
-    total_jobs = cursor.fetchone()[0]
-    
-    # Agent performance
-    cursor = conn.execute("""
-        SELECT agent_type, agent_name, status, COUNT(*) as count, AVG(execution_time_ms) as avg_time
-        FROM agent_runs 
-        GROUP BY agent_type, agent_name, status
-    """)
-    agent_performance = cursor.fetchall()
-    
-    conn.close()
+    # Job and agent statistics (read from the rollups maintained by triggers)
+    job_manager = app.state.job_manager
+    job_stats, agent_type_count = job_manager.get_platform_overview()
+    total_jobs = sum(job_stats.values())
+    platform_overview = {
+        "total_jobs": total_jobs,
+        "job_statistics": job_stats,
+        "success_rate": job_stats.get("completed", 0) / total_jobs if total_jobs > 0 else 0,
+        "agent_types_integrated": agent_type_count
+    }
     
-    # Process agent performance data
-    agent_stats = {}
-    for agent_type, agent_name, status, count, avg_time in agent_performance:
-        if agent_type not in agent_stats:
-            agent_stats[agent_type] = {}
-        if agent_name not in agent_stats[agent_type]:
-            agent_stats[agent_type][agent_name] = {"total": 0, "successful": 0, "avg_time": 0}
-        
-        agent_stats[agent_type][agent_name]["total"] += count
-        if status in ["success", "completed"]:
-            agent_stats[agent_type][agent_name]["successful"] += count
-        agent_stats[agent_type][agent_name]["avg_time"] = avg_time or 0
+    def stream_analytics():
+        # Emit agent_performance one agent type at a time as rows are fetched,
+        # instead of building the nested dict for the whole rollup
+        yield b'{"platform_overview":' + _dump_json(platform_overview) + b',"agent_performance":{'
+        rows = job_manager.iter_agent_performance()
+        for index, (agent_type, agent_rows) in enumerate(groupby(rows, key=itemgetter(0))):
+            agents = {
+                agent_name: {"total": total, "successful": successful, "avg_time": avg_time or 0}
+                for _, agent_name, total, successful, avg_time in agent_rows
+            }
+            yield (b"," if index else b"") + _dump_json({agent_type: agents})[1:-1]
+        yield b"}" + _STATIC_ANALYTICS_FRAGMENT
     
-    return {
-        "platform_overview": {
-            "total_jobs": total_jobs,
-            "job_statistics": job_stats,
-            "success_rate": job_stats.get("completed", 0) / total_jobs if total_jobs > 0 else 0,
-            "agent_types_integrated": len(agent_stats)
-        },
-        "agent_performance": agent_stats,
-        "integration_status": {
-            "cohort_agents": "✅ Integrated",
-            "qa_agents": "✅ Integrated", 
-            "research_agents": "✅ Integrated",
-            "reporting_agents": "✅ Integrated",
-            "backend_source": "Your comprehensive multi-agent system"
-        },
-        "capabilities": {
-            "demographic_modeling": True,
-            "clinical_journey_simulation": True,
-            "comorbidity_modeling": True,
-            "medication_planning": True,
-            "lab_generation": True,
-            "vital_signs_generation": True,
-            "statistical_validation": True,
-            "bias_detection": True,
-            "realism_checking": True,
-            "literature_mining": True,
-            "ontology_mapping": True,
-            "fhir_export": True,
-            "audit_trails": True,
-            "trust_scoring": True
-        }
-    }
+    return StreamingResponse(stream_analytics(), media_type="application/json")
 
 @app.get("/api/v2/jobs/{job_id}/results")
-async def get_job_results(job_id: str):
+def get_job_results(job_id: str):
     """Get detailed results from a completed generation job"""
     
-    job = job_manager.get_job(job_id)
+    job = app.state.job_manager.get_job(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
     if job["status"] != "completed":
         raise HTTPException(status_code=400, detail="Job not yet completed")
     
-    agent_runs = job_manager.get_agent_runs(job_id)
+    agent_runs = app.state.job_manager.get_agent_runs(job_id)
     
     return {
         "job_id": job_id,
         "generation_summary": job["result_summary"],
         "agent_execution_details": agent_runs,
         "export_formats": {
-            "fhir_bundle": f"/api/v2/jobs/{job_id}/export/fhir",
-            "csv_export": f"/api/v2/jobs/{job_id}/export/csv", 
-            "audit_trail": f"/api/v2/jobs/{job_id}/export/audit",
-            "trust_report": f"/api/v2/jobs/{job_id}/export/trust"
+            format_name: f"/api/v2/jobs/{job_id}/export/{suffix}"
+            for format_name, suffix in _EXPORT_FORMATS
         },
         "quality_metrics": job.get("result_summary", {}).get("quality_summary", {}),
         "data_summary": job.get("result_summary", {}).get("data_summary", {})
     }
 
 # Langflow-specific endpoints
+# Langflow template responses are static, so their metadata is computed and
+# encoded once at import
+_TEMPLATE_METADATA = {
+    template_name: flow_metadata(template)
+    for template_name, template in LANGFLOW_TEMPLATES.items()
+}
+
+_TEMPLATES_LIST = [
+    {
+        "name": template_name,
+        "display_name": template_data["name"],
+        "description": template_data["description"],
+        "node_count": _TEMPLATE_METADATA[template_name]["node_count"],
+        "edge_count": _TEMPLATE_METADATA[template_name]["edge_count"],
+        "estimated_duration": "1-3 minutes"
+    }
+    for template_name, template_data in LANGFLOW_TEMPLATES.items()
+]
+
+_TEMPLATES_RESPONSE_BYTES = _dump_json({
+    "templates": _TEMPLATES_LIST,
+    "langflow_enabled": True,
+    "custom_flows_supported": True
+})
+
+_FLOW_DETAIL_BYTES = {
+    template_name: _dump_json({
+        "flow_name": template_name,
+        "definition": template,
+        "node_details": _TEMPLATE_METADATA[template_name]["node_details"],
+        "execution_graph": {
+            "nodes": _TEMPLATE_METADATA[template_name]["node_count"],
+            "edges": _TEMPLATE_METADATA[template_name]["edge_count"],
+            "parallel_sections": _TEMPLATE_METADATA[template_name]["parallel_sections"]
+        }
+    })
+    for template_name, template in LANGFLOW_TEMPLATES.items()
+}
+
 @app.get("/api/v2/langflow/templates")
 async def get_langflow_templates():
     """Get available Langflow workflow templates"""
-    
-    templates = []
-    for template_name, template_data in LANGFLOW_TEMPLATES.items():
-        templates.append({
-            "name": template_name,
-            "display_name": template_data["name"],
-            "description": template_data["description"],
-            "node_count": len(template_data["nodes"]),
-            "edge_count": len(template_data["edges"]),
-            "estimated_duration": "1-3 minutes"
-        })
-    
-    return {
-        "templates": templates,
-        "langflow_enabled": True,
-        "custom_flows_supported": True
-    }
+    return Response(content=_TEMPLATES_RESPONSE_BYTES, media_type="application/json")
 
-@app.post("/api/v2/langflow/generate")
-async def generate_with_langflow(
-    request: dict,
-    background_tasks: BackgroundTasks
-):
+@app.post("/api/v2/langflow/generate", status_code=202)
+async def generate_with_langflow(request: dict):
     """Generate using Langflow-based orchestration"""
     
+    job_queue = get_job_queue()
+    
     flow_name = request.get("flow_name", "comprehensive_ehr")
     population_size = request.get("population_size", 100)
     condition = request.get("condition", "hypertension")
     flow_config = request.get("flow_config", {})
     
     # Create job
-    job_id = str(uuid.uuid4())
+    job_uuid = uuid.uuid4()
+    job_id = job_uuid.hex
     job_data = {
         "flow_name": flow_name,
         "population_size": population_size,
@@ -466,19 +812,17 @@ async def generate_with_langflow(
         "orchestration_type": "langflow"
     }
     
-    job_manager.create_job(job_id, job_data)
+    registered_flow = app.state.langflow_orchestrator.flow_definitions.get(flow_name)
+    expected_agent_count = registered_flow["metadata"]["agent_count"] if registered_flow else None
+    await asyncio.to_thread(app.state.job_manager.create_job, job_id, job_data, expected_agent_count)
     
-    # Start Langflow execution
-    background_tasks.add_task(
-        execute_langflow_pipeline,
-        job_id,
-        flow_name,
-        job_data
-    )
+    # Queue Langflow execution
+    await enqueue_job(job_queue, job_id, (execute_langflow_pipeline, (job_uuid, flow_name, job_data)))
     
     return {
         "job_id": job_id,
         "status": "pending",
+        "queue_position": job_queue.qsize(),
         "message": f"Langflow pipeline '{flow_name}' started",
         "flow_name": flow_name,
         "orchestration_type": "langflow",
@@ -490,29 +834,13 @@ async def generate_with_langflow(
 async def get_langflow_definition(flow_name: str):
     """Get Langflow workflow definition"""
     
-    if flow_name not in LANGFLOW_TEMPLATES:
+    flow_detail = _FLOW_DETAIL_BYTES.get(flow_name)
+    if flow_detail is None:
         raise HTTPException(status_code=404, detail="Flow template not found")
     
-    template = LANGFLOW_TEMPLATES[flow_name]
-    
-    return {
-        "flow_name": flow_name,
-        "definition": template,
-        "node_details": [
-            {
-                "id": node["id"],
-                "type": node["type"],
-                "agent_name": node.get("data", {}).get("agent_name", "N/A"),
-                "agent_type": node.get("data", {}).get("agent_type", "N/A")
-            }
-            for node in template["nodes"]
-        ],
-        "execution_graph": {
-            "nodes": len(template["nodes"]),
-            "edges": len(template["edges"]),
-            "parallel_sections": len([n for n in template["nodes"] if n["type"] == "parallel_group"])
-        }
-    }
+    return Response(content=flow_detail, media_type="application/json")
+
+_REQUIRED_FLOW_FIELDS = ("nodes", "edges")
 
 @app.post("/api/v2/langflow/flows")
 async def create_custom_flow(flow_definition: dict):
@@ -523,57 +851,58 @@ async def create_custom_flow(flow_definition: dict):
         raise HTTPException(status_code=400, detail="Flow name is required")
     
     # Validate flow definition
-    required_fields = ["nodes", "edges"]
-    for field in required_fields:
+    for field in _REQUIRED_FLOW_FIELDS:
         if field not in flow_definition:
             raise HTTPException(status_code=400, detail=f"Missing required field: {field}")
     
-    # Register the custom flow
-    langflow_orchestrator.register_flow(flow_name, flow_definition)
+    # Register the custom flow; its graph is indexed at registration time
+    try:
+        metadata = app.state.langflow_orchestrator.register_flow(flow_name, flow_definition)
+    except (KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid flow definition: {e}")
     
     return {
         "flow_name": flow_name,
         "status": "registered",
         "message": "Custom flow registered successfully",
-        "node_count": len(flow_definition["nodes"]),
-        "edge_count": len(flow_definition["edges"])
+        "node_count": metadata["node_count"],
+        "edge_count": metadata["edge_count"]
     }
 
 # Background task for Langflow execution
-async def execute_langflow_pipeline(job_id: str, flow_name: str, request_data: dict):
+async def execute_langflow_pipeline(job_uuid: uuid.UUID, flow_name: str, request_data: dict):
     """Execute Langflow pipeline in background"""
     
+    job_id = job_uuid.hex
     try:
-        job_manager.update_job_status(job_id, "running")
+        # Claim the job in one conditional UPDATE ... RETURNING round-trip
+        if not await asyncio.to_thread(app.state.job_manager.start_job, job_id):
+            return
         
         # Execute the Langflow pipeline
-        result = await langflow_orchestrator.execute_langflow_pipeline(
+        result = await app.state.langflow_orchestrator.execute_langflow_pipeline(
             flow_name,
-            uuid.UUID(job_id),
+            job_uuid,
             request_data
         )
         
-        # Store agent runs
-        for agent_run in result.get("agent_runs", []):
-            job_manager.add_agent_run(job_id, agent_run)
-        
-        # Update job with results
+        # Store agent runs and results in one transaction
         result_summary = result.get("generation_summary", {})
         result_summary["orchestration_type"] = "langflow"
         result_summary["flow_name"] = flow_name
         
-        job_manager.update_job_status(job_id, "completed", result_summary)
+        await asyncio.to_thread(app.state.job_manager.finalize_job, job_id, "completed", result_summary, result.get("agent_runs", []))
         
     except Exception as e:
-        job_manager.update_job_status(job_id, "failed", {"error": str(e), "orchestration_type": "langflow"})
+        await asyncio.to_thread(app.state.job_manager.update_job_status, job_id, "failed", {"error": str(e), "orchestration_type": "langflow"})
         print(f"Error in Langflow pipeline execution: {e}")
 
 # Mind Map Chain-of-Thought endpoints
 @app.get("/api/v2/mindmap/demo")
-async def get_demo_mindmap():
+def get_demo_mindmap():
     """Get demonstration mind map for 5-patient CKD+Diabetes cohort"""
     
-    demo_data = demonstrate_ckd_diabetes_cohort()
+    demo_data = app.state.demo_mindmap
     return {
         "demonstration": "5-patient CKD+Diabetes cohort generation",
         "mind_map": demo_data["mind_map"],
@@ -588,10 +917,10 @@ async def get_demo_mindmap():
     }
 
 @app.get("/api/v2/mindmap/node/{node_id}")
-async def get_node_details(node_id: str):
+def get_node_details(node_id: str):
     """Get detailed chain-of-thought for a specific node"""
     
-    demo_data = demonstrate_ckd_diabetes_cohort()
+    demo_data = app.state.demo_mindmap
     
     if node_id not in demo_data["mind_map"]:
         raise HTTPException(status_code=404, detail="Node not found")
@@ -617,31 +946,16 @@ async def get_node_details(node_id: str):
     }
 
 @app.get("/api/v2/mindmap/replay/{node_id}")
-async def replay_node_subtree(node_id: str):
+def replay_node_subtree(node_id: str):
     """Replay execution of a node's subtree in chronological order"""
     
-    demo_data = demonstrate_ckd_diabetes_cohort()
+    demo_data = app.state.demo_mindmap
     
     if node_id not in demo_data["mind_map"]:
         raise HTTPException(status_code=404, detail="Node not found")
     
-    # Build subtree replay sequence
-    def get_subtree_nodes(current_id, mind_map, visited=None):
-        if visited is None:
-            visited = set()
-        
-        if current_id in visited or current_id not in mind_map:
-            return []
-        
-        visited.add(current_id)
-        subtree = [current_id]
-        
-        for child_id in mind_map[current_id]["children"]:
-            subtree.extend(get_subtree_nodes(child_id, mind_map, visited))
-        
-        return subtree
-    
-    subtree_nodes = get_subtree_nodes(node_id, demo_data["mind_map"])
+    # Build subtree replay sequence from the precomputed adjacency index
+    subtree_nodes = app.state.demo_mindmap_index.subtree(node_id)
     
     replay_sequence = []
     for i, sub_node_id in enumerate(subtree_nodes):
@@ -670,7 +984,7 @@ async def replay_node_subtree(node_id: str):
     }
 
 @app.post("/api/v2/leads")
-async def capture_lead(lead_data: dict):
+def capture_lead(lead_data: dict):
     """Capture comprehensive waitlist information from landing page"""
     
     with Session(engine) as session:
@@ -748,19 +1062,25 @@ async def capture_lead(lead_data: dict):
                 "error": str(e)
             }
 
-@app.post("/api/v2/mindmap/generate")
-async def generate_with_mindmap(
-    request: dict,
-    background_tasks: BackgroundTasks
-):
+_MINDMAP_FEATURES = (
+    "Detailed reasoning chains for each agent",
+    "Interactive node exploration",
+    "Subtree replay capabilities",
+    "Phase-based analysis"
+)
+
+@app.post("/api/v2/mindmap/generate", status_code=202)
+async def generate_with_mindmap(request: dict):
     """Generate cohort with full chain-of-thought mind mapping"""
     
+    job_queue = get_job_queue()
+    
     population_size = request.get("population_size", 100)
     condition = request.get("condition", "hypertension")
     use_case = request.get("use_case", "clinical_research")
     
     # Create job
-    job_id = str(uuid.uuid4())
+    job_id = uuid.uuid4().hex
     job_data = {
         "population_size": population_size,
         "condition": condition,
@@ -769,26 +1089,19 @@ async def generate_with_mindmap(
         "chain_of_thought_enabled": True
     }
     
-    job_manager.create_job(job_id, job_data)
+    # The demo mind map records no agent runs, so progress follows job status
+    await asyncio.to_thread(app.state.job_manager.create_job, job_id, job_data, 0)
     
-    # Start mind map generation (would be async in real implementation)
-    background_tasks.add_task(
-        execute_mindmap_generation,
-        job_id,
-        job_data
-    )
+    # Queue mind map generation (would be async in real implementation)
+    await enqueue_job(job_queue, job_id, (execute_mindmap_generation, (job_id, job_data)))
     
     return {
         "job_id": job_id,
         "status": "pending",
+        "queue_position": job_queue.qsize(),
         "message": "Mind map generation started with full chain-of-thought logging",
         "orchestration_type": "mindmap",
-        "features": [
-            "Detailed reasoning chains for each agent",
-            "Interactive node exploration",
-            "Subtree replay capabilities",
-            "Phase-based analysis"
-        ],
+        "features": _MINDMAP_FEATURES,
         "estimated_completion": "3-5 minutes"
     }
 
@@ -797,11 +1110,9 @@ async def execute_mindmap_generation(job_id: str, request_data: dict):
     """Execute mind map generation in background"""
     
     try:
-        job_manager.update_job_status(job_id, "running")
-        
         # Execute with mind mapping (would be async call in real implementation)
         # For now, return demo structure
-        result = demonstrate_ckd_diabetes_cohort()
+        result = app.state.demo_mindmap
         
         # Store results
         result_summary = {
@@ -812,11 +1123,22 @@ async def execute_mindmap_generation(job_id: str, request_data: dict):
             "interactive_features_enabled": True
         }
         
-        job_manager.update_job_status(job_id, "completed", result_summary)
+        # Nothing is awaited between pickup and completion, so the job goes
+        # straight from pending to completed in a single write
+        await asyncio.to_thread(app.state.job_manager.finalize_job, job_id, "completed", result_summary, [])
         
     except Exception as e:
-        job_manager.update_job_status(job_id, "failed", {"error": str(e), "orchestration_type": "mindmap"})
+        await asyncio.to_thread(app.state.job_manager.update_job_status, job_id, "failed", {"error": str(e), "orchestration_type": "mindmap"})
         print(f"Error in mind map generation: {e}")
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8003)
\ No newline at end of file
+    # One worker process per CPU by default; "auto" selects uvloop and
+    # httptools whenever they are installed (uvicorn[standard])
+    uvicorn.run(
+        "integrated_server_v2:app",
+        host="0.0.0.0",
+        port=8003,
+        workers=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))),
+        loop="auto",
+        http="auto"
+    )
\ No newline at end of file
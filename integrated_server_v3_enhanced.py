@@ -7,15 +7,29 @@ import asyncio
 import uuid
 import sqlite3
 import json
-from datetime import datetime
+import threading
+import queue
+import time
+import functools
+import hashlib
+import io
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
-from fastapi import FastAPI, BackgroundTasks, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 import os
 import zipfile
+import anyio
 from pydantic import BaseModel, Field
 
+try:
+    import orjson
+except ImportError:  # stdlib json fallback; same stored text, just slower
+    orjson = None
+
 # Import the enhanced orchestrator and Langflow integration
 from agents.integrated.enhanced_orchestrator import EnhancedAgentOrchestrator
 from agents.langflow.langflow_exporter import LangflowExporter, generate_langflow_exports
@@ -44,16 +58,172 @@ class EnhancedJobStatus(BaseModel):
     agent_runs: List[Dict[str, Any]] = []
     phase_results: Dict[str, Any] = {}
     
+def _json_default(value: Any) -> Any:
+    """Match orjson's handling of datetimes and other non-JSON types"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def _dump_json(value: Any) -> str:
+    """Encode a JSON column value as TEXT"""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(value, separators=(",", ":"), default=_json_default)
+
+_load_json = orjson.loads if orjson is not None else json.loads
+
+# (epoch second, ISO-8601 text) for the dashboard "current time" fields
+_utc_second_cache = (0, "")
+
+def _utc_now_iso() -> str:
+    """Current UTC time to the second, formatted once per second"""
+    global _utc_second_cache
+    now = int(time.time())
+    if now != _utc_second_cache[0]:
+        _utc_second_cache = (now, time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(now)))
+    return _utc_second_cache[1]
+
+# Connection tuning applied once when the shared connection is opened.
+# page_size must precede the switch to WAL and only affects a new database
+# file; mmap_size lets hot reads come straight from the OS page cache.
+_SQLITE_PRAGMAS = (
+    "PRAGMA page_size=8192",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-131072",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Job timestamps are stored as integer microseconds since the Unix epoch (UTC)
+_EPOCH = datetime(1970, 1, 1)
+
+def _now_us() -> int:
+    """Current UTC time in epoch microseconds"""
+    return time.time_ns() // 1000
+
+def _from_epoch_us(value: int) -> datetime:
+    """Naive UTC datetime for an epoch-microsecond timestamp"""
+    return _EPOCH + timedelta(microseconds=value)
+
+def _to_epoch_us(value: str) -> int:
+    """Epoch microseconds for a naive UTC ISO timestamp"""
+    delta = datetime.fromisoformat(value) - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+# Reader connections kept open alongside the single writer
+_READ_POOL_SIZE = int(os.getenv("JOB_DB_READERS", "8"))
+
+# Write-path statements kept as fixed strings so every call hits the
+# connection's prepared-statement cache
+_SQL_INSERT_JOB = """
+    INSERT INTO enhanced_jobs (job_id, request_data, status, started_at_us)
+    VALUES (?, ?, 'pending', ?)
+"""
+
+# Terminal statuses stamp ended_at_us (?5); summary and phase results are only
+# overwritten when provided (NULL keeps the stored value)
+_SQL_UPDATE_JOB_STATUS = """
+    UPDATE enhanced_jobs
+    SET status = ?1,
+        ended_at_us = CASE WHEN ?1 IN ('completed', 'failed', 'error') THEN ?5 ELSE ended_at_us END,
+        result_summary = COALESCE(?2, result_summary),
+        phase_results = COALESCE(?3, phase_results)
+    WHERE job_id = ?4
+"""
+
+_SQL_INSERT_AGENT_RUN = """
+    INSERT INTO enhanced_agent_runs 
+    (run_id, job_id, agent_name, agent_type, agent_role, phase_name,
+     input_data, output_data, execution_time_ms, status, 
+     privacy_assessment, clinical_review_status)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_GET_JOB = """
+    SELECT job_id, request_data, status, started_at_us, ended_at_us, 
+           result_summary, phase_results
+    FROM enhanced_jobs WHERE job_id = ?
+"""
+
+# The fields a status poll needs, plus the job's completed and total run counts
+_SQL_GET_JOB_WITH_PROGRESS = """
+    SELECT status, started_at_us, ended_at_us, result_summary, phase_results,
+           (SELECT COUNT(*) FROM enhanced_agent_runs r
+            WHERE r.job_id = j.job_id AND r.status IN ('success', 'completed')),
+           (SELECT COUNT(*) FROM enhanced_agent_runs r WHERE r.job_id = j.job_id)
+    FROM enhanced_jobs j WHERE job_id = ?
+"""
+
+_SQL_GET_LATEST_RUN = """
+    SELECT phase_name, agent_name, status FROM enhanced_agent_runs
+    WHERE job_id = ?
+    ORDER BY ran_at DESC, rowid DESC
+    LIMIT 1
+"""
+
+# Approximate total agents in the comprehensive pipeline, used for progress
+_EXPECTED_AGENT_COUNT = 50
+
+# Dashboard aggregates may lag writes by at most this long
+_AGGREGATE_TTL_SECONDS = 3.0
+
+def _ttl_cached(*tables):
+    """Memoize an aggregate query for a few seconds, keyed by method and args.
+    Writes to any of ``tables`` drop the cached result early."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args):
+            key = (tables, method.__name__, args)
+            now = time.monotonic()
+            cached = self._aggregate_cache.get(key)
+            if cached is not None and cached[0] > now:
+                return cached[1]
+            value = method(self, *args)
+            self._aggregate_cache[key] = (now + _AGGREGATE_TTL_SECONDS, value)
+            return value
+        return wrapper
+    return decorator
+
 class EnhancedJobManager:
     """Enhanced job manager with comprehensive tracking"""
     
     def __init__(self):
         self.db_path = "enhanced_ehr_jobs.db"
+        # One long-lived writer connection, serialized by the lock, plus a
+        # pool of reader connections that WAL lets run alongside the writer.
+        # Writer transactions open with BEGIN IMMEDIATE so a batch takes the
+        # database write lock up front rather than upgrading mid-transaction
+        self._conn = self._connect(isolation_level="IMMEDIATE")
+        self._lock = threading.Lock()
+        self._aggregate_cache = {}
         self.init_db()
+        self._read_pool: queue.Queue = queue.Queue()
+        for _ in range(_READ_POOL_SIZE):
+            self._read_pool.put(self._connect())
+    
+    def _connect(self, isolation_level: Optional[str] = "") -> sqlite3.Connection:
+        """Open a connection with the shared tuning applied"""
+        conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, cached_statements=256, isolation_level=isolation_level
+        )
+        for pragma in _SQLITE_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    @contextmanager
+    def _read_connection(self):
+        """Borrow a reader connection from the pool for the duration of a query"""
+        conn = self._read_pool.get()
+        try:
+            yield conn
+        finally:
+            self._read_pool.put(conn)
     
     def init_db(self):
         """Initialize enhanced SQLite database for job tracking"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conn
         cursor = conn.cursor()
         
         # Enhanced jobs table
@@ -67,9 +237,26 @@ class EnhancedJobManager:
                 ended_at TIMESTAMP,
                 result_summary TEXT,
                 phase_results TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                started_at_us INTEGER,
+                ended_at_us INTEGER
             )
         """)
+        # Databases created before epoch timestamps get the integer columns
+        # added and backfilled from the legacy timestamp text columns once
+        job_columns = {row[1] for row in cursor.execute("PRAGMA table_info(enhanced_jobs)")}
+        if "started_at_us" not in job_columns:
+            cursor.execute("ALTER TABLE enhanced_jobs ADD COLUMN started_at_us INTEGER")
+            cursor.execute("ALTER TABLE enhanced_jobs ADD COLUMN ended_at_us INTEGER")
+            cursor.executemany(
+                "UPDATE enhanced_jobs SET started_at_us = ?, ended_at_us = ? WHERE job_id = ?",
+                [
+                    (_to_epoch_us(started_at) if started_at else None, _to_epoch_us(ended_at) if ended_at else None, job_id)
+                    for job_id, started_at, ended_at in cursor.execute(
+                        "SELECT job_id, started_at, ended_at FROM enhanced_jobs"
+                    ).fetchall()
+                ]
+            )
         
         # Enhanced agent runs table
         cursor.execute("""
@@ -106,119 +293,149 @@ class EnhancedJobManager:
             )
         """)
         
+        # Indexes for per-job run listings, role/status rollups and recency ordering.
+        # The role index carries execution_time_ms so the per-role rollup is
+        # answered from the index alone (it supersedes idx_runs_role)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_runs_job_ran ON enhanced_agent_runs (job_id, ran_at)")
+        cursor.execute("DROP INDEX IF EXISTS idx_runs_role")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_runs_role_time ON enhanced_agent_runs (agent_role, status, execution_time_ms)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_runs_ran_agent ON enhanced_agent_runs (ran_at, agent_name)")
+        cursor.execute("DROP INDEX IF EXISTS idx_jobs_started")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_started_us ON enhanced_jobs (started_at_us DESC)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON enhanced_jobs (status)")
+        
         conn.commit()
-        conn.close()
+        # Refresh planner statistics so the indexes above are picked up
+        conn.execute("ANALYZE")
+    
+    def _invalidate(self, table: str):
+        """Drop cached aggregates computed over ``table``"""
+        for key in list(self._aggregate_cache):
+            if table in key[0]:
+                self._aggregate_cache.pop(key, None)
     
     def create_job(self, job_id: str, request_data: Dict[str, Any]) -> str:
         """Create a new enhanced job record"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO enhanced_jobs (job_id, request_data, status)
-            VALUES (?, ?, 'pending')
-        """, (job_id, json.dumps(request_data)))
-        
-        conn.commit()
-        conn.close()
+        with self._lock, self._conn:
+            self._conn.execute(_SQL_INSERT_JOB, (job_id, _dump_json(request_data), _now_us()))
+        self._invalidate("enhanced_jobs")
         return job_id
     
     def update_job_status(self, job_id: str, status: str, result_summary: Optional[Dict] = None,
                          phase_results: Optional[Dict] = None):
         """Update enhanced job status"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        update_data = [status]
-        update_sql = "UPDATE enhanced_jobs SET status = ?"
-        
-        if status in ['completed', 'failed', 'error']:
-            update_sql += ", ended_at = CURRENT_TIMESTAMP"
-        
-        if result_summary:
-            update_sql += ", result_summary = ?"
-            update_data.append(json.dumps(result_summary))
-        
-        if phase_results:
-            update_sql += ", phase_results = ?"
-            update_data.append(json.dumps(phase_results))
-        
-        update_sql += " WHERE job_id = ?"
-        update_data.append(job_id)
-        
-        cursor.execute(update_sql, update_data)
-        conn.commit()
-        conn.close()
+        with self._lock, self._conn:
+            self._conn.execute(_SQL_UPDATE_JOB_STATUS, (
+                status,
+                _dump_json(result_summary) if result_summary else None,
+                _dump_json(phase_results) if phase_results else None,
+                job_id,
+                _now_us()
+            ))
+        self._invalidate("enhanced_jobs")
     
     def get_job(self, job_id: str) -> Optional[Dict]:
         """Get enhanced job by ID"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._read_connection() as conn:
+            row = conn.execute(_SQL_GET_JOB, (job_id,)).fetchone()
         
-        cursor.execute("""
-            SELECT job_id, request_data, status, started_at, ended_at, 
-                   result_summary, phase_results
-            FROM enhanced_jobs WHERE job_id = ?
-        """, (job_id,))
+        return self._job_from_row(row) if row else None
+    
+    def get_job_encoded(self, job_id: str) -> Optional[tuple]:
+        """Get a job's status, result summary and phase results, the latter two
+        as their stored JSON text; None if the job does not exist"""
+        with self._read_connection() as conn:
+            row = conn.execute("""
+                SELECT status, result_summary, phase_results
+                FROM enhanced_jobs WHERE job_id = ?
+            """, (job_id,)).fetchone()
         
-        row = cursor.fetchone()
-        conn.close()
+        return (row[0], row[1] or "{}", row[2] or "{}") if row else None
+    
+    def get_job_with_progress(self, job_id: str):
+        """Get a job's status row (status, started/ended epoch microseconds,
+        result summary and phase results as stored JSON text, completed and
+        total run counts) and its latest run (phase, agent, status) from one
+        pooled connection; None if the job does not exist"""
+        with self._read_connection() as conn:
+            row = conn.execute(_SQL_GET_JOB_WITH_PROGRESS, (job_id,)).fetchone()
+            if not row:
+                return None
+            latest_run = conn.execute(_SQL_GET_LATEST_RUN, (job_id,)).fetchone()
         
-        if row:
-            return {
-                "job_id": row[0],
-                "request_data": json.loads(row[1]) if row[1] else {},
-                "status": row[2],
-                "started_at": row[3],
-                "ended_at": row[4],
-                "result_summary": json.loads(row[5]) if row[5] else {},
-                "phase_results": json.loads(row[6]) if row[6] else {}
-            }
-        return None
+        return row, latest_run
+    
+    @staticmethod
+    def _job_from_row(row) -> Dict:
+        """Build a job dict from the leading _SQL_GET_JOB columns"""
+        return {
+            "job_id": row[0],
+            "request_data": _load_json(row[1]) if row[1] else {},
+            "status": row[2],
+            "started_at": row[3],
+            "ended_at": row[4],
+            "result_summary": _load_json(row[5]) if row[5] else {},
+            "phase_results": _load_json(row[6]) if row[6] else {}
+        }
     
     def add_agent_run(self, job_id: str, agent_run: Dict[str, Any]):
         """Add enhanced agent run record"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        self.add_agent_runs_bulk(job_id, [agent_run])
+    
+    def add_agent_runs_bulk(self, job_id: str, agent_runs: List[Dict[str, Any]]):
+        """Add a batch of enhanced agent run records in one transaction"""
+        rows = self._agent_run_rows(job_id, agent_runs)
+        if not rows:
+            return
         
-        cursor.execute("""
-            INSERT INTO enhanced_agent_runs 
-            (run_id, job_id, agent_name, agent_type, agent_role, phase_name,
-             input_data, output_data, execution_time_ms, status, 
-             privacy_assessment, clinical_review_status)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        with self._lock, self._conn:
+            self._conn.executemany(_SQL_INSERT_AGENT_RUN, rows)
+        self._invalidate("enhanced_agent_runs")
+    
+    def finalize_job(self, job_id: str, status: str, result_summary: Optional[Dict],
+                     phase_results: Optional[Dict], agent_runs: List[Dict[str, Any]]):
+        """Write a job's agent runs and final status in a single transaction"""
+        rows = self._agent_run_rows(job_id, agent_runs)
+        with self._lock, self._conn:
+            self._conn.executemany(_SQL_INSERT_AGENT_RUN, rows)
+            self._conn.execute(_SQL_UPDATE_JOB_STATUS, (
+                status,
+                _dump_json(result_summary) if result_summary else None,
+                _dump_json(phase_results) if phase_results else None,
+                job_id,
+                _now_us()
+            ))
+        self._invalidate("enhanced_agent_runs")
+        self._invalidate("enhanced_jobs")
+    
+    @staticmethod
+    def _agent_run_rows(job_id: str, agent_runs: List[Dict[str, Any]]) -> List[tuple]:
+        """Build enhanced_agent_runs insert rows in one pass"""
+        return [(
             str(uuid.uuid4()),
             job_id,
             agent_run.get("agent_name", ""),
             agent_run.get("agent_type", ""),
             agent_run.get("agent_role", ""),
             agent_run.get("phase_name", ""),
-            json.dumps(agent_run.get("input_data", {})),
-            json.dumps(agent_run.get("output_data", {})),
+            _dump_json(agent_run.get("input_data", {})),
+            _dump_json(agent_run.get("output_data", {})),
             agent_run.get("execution_time_ms", 0),
             agent_run.get("status", "completed"),
-            json.dumps(agent_run.get("privacy_assessment", {})),
+            _dump_json(agent_run.get("privacy_assessment", {})),
             agent_run.get("clinical_review_status", "pending")
-        ))
-        
-        conn.commit()
-        conn.close()
+        ) for agent_run in agent_runs]
     
-    def get_agent_runs(self, job_id: str) -> List[Dict]:
-        """Get enhanced agent runs for a job"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT agent_name, agent_type, agent_role, phase_name, status, 
-                   execution_time_ms, ran_at, privacy_assessment, clinical_review_status
-            FROM enhanced_agent_runs WHERE job_id = ?
-            ORDER BY ran_at
-        """, (job_id,))
-        
-        rows = cursor.fetchall()
-        conn.close()
+    def get_agent_runs_detailed(self, job_id: str) -> List[Dict]:
+        """Get enhanced agent runs for a job, privacy assessments left as
+        encoded JSON text for the results endpoint to splice in"""
+        with self._read_connection() as conn:
+            rows = conn.execute("""
+                SELECT agent_name, agent_type, agent_role, phase_name, status, 
+                       execution_time_ms, ran_at, privacy_assessment, clinical_review_status
+                FROM enhanced_agent_runs WHERE job_id = ?
+                ORDER BY ran_at
+            """, (job_id,)).fetchall()
         
         return [{
             "agent_name": row[0],
@@ -228,15 +445,183 @@ class EnhancedJobManager:
             "status": row[4],
             "execution_time_ms": row[5],
             "ran_at": row[6],
-            "privacy_assessment": json.loads(row[7]) if row[7] else {},
+            "privacy_assessment": row[7] or "{}",
             "clinical_review_status": row[8]
         } for row in rows]
+    
+    def get_agent_runs_summary(self, job_id: str) -> List[Dict]:
+        """Get the scalar columns of a job's agent runs, never reading the JSON blobs"""
+        with self._read_connection() as conn:
+            rows = conn.execute("""
+                SELECT agent_name, agent_type, agent_role, phase_name, status,
+                       execution_time_ms, ran_at
+                FROM enhanced_agent_runs WHERE job_id = ?
+                ORDER BY ran_at
+            """, (job_id,)).fetchall()
+        
+        return [{
+            "agent_name": row[0],
+            "agent_type": row[1],
+            "agent_role": row[2],
+            "phase_name": row[3],
+            "status": row[4],
+            "execution_time_ms": row[5],
+            "ran_at": row[6]
+        } for row in rows]
+    
+    def get_run_stats(self, job_id: str):
+        """Get a job's run count, successful run count and mean execution time"""
+        with self._read_connection() as conn:
+            return conn.execute("""
+                SELECT COUNT(*),
+                       COALESCE(SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END), 0),
+                       COALESCE(AVG(execution_time_ms), 0)
+                FROM enhanced_agent_runs WHERE job_id = ?
+            """, (job_id,)).fetchone()
+    
+    @_ttl_cached("enhanced_jobs")
+    def get_job_status_counts(self) -> Dict[str, int]:
+        """Get job counts keyed by status"""
+        with self._read_connection() as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM enhanced_jobs GROUP BY status").fetchall())
+    
+    @_ttl_cached("enhanced_agent_runs")
+    def get_role_performance(self) -> List[tuple]:
+        """Get run count, mean time and success rate (percent) per agent role"""
+        with self._read_connection() as conn:
+            return conn.execute("""
+                SELECT agent_role, COUNT(*), AVG(execution_time_ms), 
+                       SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END) * 100.0 / COUNT(*)
+                FROM enhanced_agent_runs 
+                GROUP BY agent_role
+            """).fetchall()
+    
+    @_ttl_cached("enhanced_jobs")
+    def get_dashboard_counts(self):
+        """Get total, running and completed job counts in one pass over the status index"""
+        with self._read_connection() as conn:
+            return conn.execute("""
+                SELECT COUNT(*),
+                       COALESCE(SUM(status = 'running'), 0),
+                       COALESCE(SUM(status = 'completed'), 0)
+                FROM enhanced_jobs
+            """).fetchone()
+    
+    def get_recent_jobs(self, limit: int) -> List[tuple]:
+        """Get the most recently started jobs with progress and card fields computed in SQL"""
+        with self._read_connection() as conn:
+            return conn.execute("""
+                SELECT j.job_id, j.status,
+                       MIN((SELECT COUNT(*) FROM enhanced_agent_runs r
+                            WHERE r.job_id = j.job_id AND r.status IN ('success', 'completed')
+                           ) * 100.0 / ?, 100.0),
+                       CASE WHEN j.status = 'running' THEN
+                           (SELECT r.phase_name FROM enhanced_agent_runs r
+                            WHERE r.job_id = j.job_id
+                            ORDER BY r.ran_at DESC, r.rowid DESC LIMIT 1)
+                       END,
+                       j.started_at_us,
+                       COALESCE(json_extract(j.result_summary, '$.population_size'), 100),
+                       COALESCE(json_extract(j.result_summary, '$.condition'), 'general')
+                FROM enhanced_jobs j
+                ORDER BY j.started_at_us DESC 
+                LIMIT ?
+            """, (_EXPECTED_AGENT_COUNT, limit)).fetchall()
+    
+    @_ttl_cached("enhanced_agent_runs")
+    def get_agent_status_rows(self) -> List[tuple]:
+        """Get per-agent execution statistics for the ten busiest agents, with
+        success rate (percent) and mean execution time (seconds) computed in SQL"""
+        with self._read_connection() as conn:
+            return conn.execute("""
+                SELECT agent_name, agent_role, 
+                       COUNT(*) as total_executions,
+                       COALESCE(AVG(execution_time_ms), 0) / 1000.0 as avg_seconds,
+                       100.0 * SUM(status = 'success') / COUNT(*) as success_rate,
+                       MAX(ran_at) as last_execution
+                FROM enhanced_agent_runs 
+                GROUP BY agent_name, agent_role
+                ORDER BY total_executions DESC
+                LIMIT 10
+            """).fetchall()
+    
+    @_ttl_cached("enhanced_jobs", "enhanced_agent_runs")
+    def get_system_counts(self):
+        """Get agents active in the last hour and the number of running jobs"""
+        with self._read_connection() as conn:
+            active_agents = conn.execute(
+                "SELECT COUNT(DISTINCT agent_name) FROM enhanced_agent_runs WHERE ran_at > datetime('now', '-1 hour')"
+            ).fetchone()[0]
+            queue_depth = conn.execute("SELECT COUNT(*) FROM enhanced_jobs WHERE status = 'running'").fetchone()[0]
+        return active_agents, queue_depth
+    
+    def close(self):
+        """Close the writer and every pooled reader connection"""
+        with self._lock:
+            self._conn.close()
+        for _ in range(_READ_POOL_SIZE):
+            self._read_pool.get().close()
+
+# Handler convention: endpoints doing synchronous (blocking) SQLite work are
+# plain ``def`` so Starlette runs them on its threadpool; only handlers that
+# await non-blocking work are ``async def``. Background pipelines and the
+# endpoints that touch the asyncio job queue stay coroutines and hand their
+# job manager calls to asyncio.to_thread instead.
+#
+# Both thread pools are sized to the connections behind them: the request
+# threadpool to the reader pool, so readers never queue on a connection
+# while holding a thread, and the asyncio default executor to one write per
+# pipeline worker plus one for job creation, since writes serialize on the
+# writer lock anyway.
+THREADPOOL_TOKENS = int(os.getenv("THREADPOOL_TOKENS", str(_READ_POOL_SIZE)))
+
+# Generation pipelines run on a bounded pool of queue workers rather than as
+# per-request background tasks competing with request handling
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "4"))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "256"))
+
+async def pipeline_worker(job_queue: asyncio.Queue):
+    """Run queued pipeline coroutines one at a time"""
+    while True:
+        pipeline, args = await job_queue.get()
+        try:
+            await pipeline(*args)
+        except Exception as e:
+            print(f"Error in queued pipeline {pipeline.__name__}: {e}")
+        finally:
+            job_queue.task_done()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the pipeline workers, and close the job database on shutdown"""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_TOKENS
+    write_executor = ThreadPoolExecutor(
+        max_workers=PIPELINE_WORKERS + 1, thread_name_prefix="job-db-writer"
+    )
+    asyncio.get_running_loop().set_default_executor(write_executor)
+    
+    app.state.job_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    
+    workers = [
+        asyncio.create_task(pipeline_worker(app.state.job_queue))
+        for _ in range(PIPELINE_WORKERS)
+    ]
+    
+    yield
+    
+    for worker in workers:
+        worker.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    write_executor.shutdown(wait=True)
+    enhanced_job_manager.close()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Enhanced Synthetic Ascension EHR Platform V3",
     description="Comprehensive Agentic EHR Synthesis with Doer/Coordinator/Adversarial Architecture",
-    version="3.0.0"
+    version="3.0.0",
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -252,84 +637,117 @@ app.add_middleware(
 enhanced_orchestrator = EnhancedAgentOrchestrator()
 enhanced_job_manager = EnhancedJobManager()
 
+_QUEUE_FULL_DETAIL = "Pipeline queue is full, retry later"
+
+def get_job_queue() -> asyncio.Queue:
+    """Return the pipeline queue, rejecting new work while it is saturated"""
+    job_queue = app.state.job_queue
+    if job_queue.full():
+        raise HTTPException(status_code=503, detail=_QUEUE_FULL_DETAIL)
+    return job_queue
+
+async def enqueue_job(job_queue: asyncio.Queue, job_id: str, work: tuple):
+    """Hand a freshly created job to the pipeline workers
+
+    Other requests can fill the queue while the job row is being written, so
+    a job that no longer fits is marked failed rather than left pending.
+    """
+    try:
+        job_queue.put_nowait(work)
+    except asyncio.QueueFull:
+        await asyncio.to_thread(
+            enhanced_job_manager.update_job_status, job_id, "failed", {"error": _QUEUE_FULL_DETAIL}
+        )
+        raise HTTPException(status_code=503, detail=_QUEUE_FULL_DETAIL)
+
+_ROOT_PAYLOAD = {
+    "service": "Enhanced Synthetic Ascension EHR Platform V3",
+    "version": "3.0.0",
+    "description": "Comprehensive Agentic EHR Synthesis implementing Doer/Coordinator/Adversarial pattern",
+    "architecture": None,  # filled from the architecture snapshot
+    "key_enhancements": [
+        "Version pinning for reproducible results",
+        "Concurrency management with deadlock prevention",
+        "Differential privacy and re-identification protection",
+        "Human-in-the-loop SLA management",
+        "Clinical realism certification",
+        "Automated ontology updates",
+        "RAG hallucination reduction",
+        "Performance monitoring and benchmarking",
+        "Comprehensive adversarial testing",
+        "Full provenance and audit trails"
+    ],
+    "endpoints": {
+        "POST /api/v3/generate": "Generate comprehensive synthetic EHR data with enhanced agent orchestration",
+        "GET /api/v3/jobs/{job_id}": "Check enhanced multi-agent generation job status",
+        "GET /api/v3/jobs/{job_id}/results": "Get detailed generation results with quality metrics",
+        "GET /api/v3/analytics": "Platform analytics and enhanced agent performance metrics",
+        "GET /api/v3/architecture": "Get comprehensive agent architecture overview"
+    }
+}
+
+def _snapshot_architecture():
+    """Build the architecture overview, and the payloads embedding it, once;
+    the orchestrator's agent registry does not change after construction"""
+    global _arch_overview, _arch_overview_bytes, _root_bytes
+    _arch_overview = enhanced_orchestrator.get_agent_architecture_overview()
+    _arch_overview_bytes = _dump_json(_arch_overview).encode()
+    _root_bytes = _dump_json(dict(_ROOT_PAYLOAD, architecture=_arch_overview)).encode()
+
+_snapshot_architecture()
+
 @app.get("/")
 async def root():
     """Enhanced system overview and agent architecture"""
-    
-    agent_overview = enhanced_orchestrator.get_agent_architecture_overview()
-    
-    return {
-        "service": "Enhanced Synthetic Ascension EHR Platform V3",
-        "version": "3.0.0",
-        "description": "Comprehensive Agentic EHR Synthesis implementing Doer/Coordinator/Adversarial pattern",
-        "architecture": agent_overview,
-        "key_enhancements": [
-            "Version pinning for reproducible results",
-            "Concurrency management with deadlock prevention",
-            "Differential privacy and re-identification protection",
-            "Human-in-the-loop SLA management",
-            "Clinical realism certification",
-            "Automated ontology updates",
-            "RAG hallucination reduction",
-            "Performance monitoring and benchmarking",
-            "Comprehensive adversarial testing",
-            "Full provenance and audit trails"
-        ],
-        "endpoints": {
-            "POST /api/v3/generate": "Generate comprehensive synthetic EHR data with enhanced agent orchestration",
-            "GET /api/v3/jobs/{job_id}": "Check enhanced multi-agent generation job status",
-            "GET /api/v3/jobs/{job_id}/results": "Get detailed generation results with quality metrics",
-            "GET /api/v3/analytics": "Platform analytics and enhanced agent performance metrics",
-            "GET /api/v3/architecture": "Get comprehensive agent architecture overview"
-        }
-    }
+    return Response(content=_root_bytes, media_type="application/json")
 
-async def execute_enhanced_generation_pipeline(job_id: str, request: EnhancedGenerationRequest):
+async def execute_enhanced_generation_pipeline(job_id: str, request_data: Dict[str, Any]):
     """Execute the enhanced comprehensive generation pipeline in background"""
     
     try:
         # Update job status to running
-        enhanced_job_manager.update_job_status(job_id, "running")
+        await asyncio.to_thread(enhanced_job_manager.update_job_status, job_id, "running")
         
         # Execute comprehensive pipeline
         pipeline_result = await enhanced_orchestrator.execute_comprehensive_pipeline(
             uuid.UUID(job_id),
-            request.dict()
+            request_data
         )
         
-        # Store agent runs
-        for agent_run in pipeline_result.get("agent_runs", []):
-            enhanced_job_manager.add_agent_run(job_id, agent_run)
-        
-        # Update job with results
-        enhanced_job_manager.update_job_status(
+        # Store agent runs and the job's results as one write: the job is
+        # written twice per run (running, then final), never per agent
+        await asyncio.to_thread(
+            enhanced_job_manager.finalize_job,
             job_id, 
             pipeline_result["overall_status"],
             pipeline_result.get("execution_summary", {}),
-            pipeline_result.get("phase_results", {})
+            pipeline_result.get("phase_results", {}),
+            pipeline_result.get("agent_runs", [])
         )
         
     except Exception as e:
-        enhanced_job_manager.update_job_status(
+        await asyncio.to_thread(
+            enhanced_job_manager.update_job_status,
             job_id, 
             "error",
             {"error": str(e), "error_timestamp": datetime.utcnow().isoformat()}
         )
 
 @app.post("/api/v3/generate")
-async def generate_enhanced_cohort(
-    request: EnhancedGenerationRequest,
-    background_tasks: BackgroundTasks
-):
+async def generate_enhanced_cohort(request: EnhancedGenerationRequest):
     """Generate comprehensive synthetic EHR data using enhanced multi-agent orchestration"""
     
+    job_queue = get_job_queue()
     job_id = str(uuid.uuid4())
     
+    # Dump the request once; the job record and the pipeline share the dict
+    request_data = request.model_dump()
+    
     # Create job record
-    enhanced_job_manager.create_job(job_id, request.dict())
+    await asyncio.to_thread(enhanced_job_manager.create_job, job_id, request_data)
     
-    # Start background processing
-    background_tasks.add_task(execute_enhanced_generation_pipeline, job_id, request)
+    # Queue background processing
+    await enqueue_job(job_queue, job_id, (execute_enhanced_generation_pipeline, (job_id, request_data)))
     
     return {
         "job_id": job_id,
@@ -346,104 +764,113 @@ async def generate_enhanced_cohort(
         ]
     }
 
-@app.get("/api/v3/jobs/{job_id}")
-async def get_enhanced_job_status(job_id: str) -> EnhancedJobStatus:
+@functools.lru_cache(maxsize=256)
+def _agent_runs_summary_json(job_id: str, run_count: int) -> str:
+    """Encoded run summary list for a job; runs are only ever appended, so
+    the run count keys out stale entries"""
+    return _dump_json(enhanced_job_manager.get_agent_runs_summary(job_id))
+
+@app.get("/api/v3/jobs/{job_id}", response_model=EnhancedJobStatus)
+def get_enhanced_job_status(job_id: str, detail: bool = True):
     """Get status of enhanced generation job"""
     
-    job = enhanced_job_manager.get_job(job_id)
-    if not job:
+    # The job, its progress and its latest run come back from one manager call;
+    # the run list is only loaded on request, and only its summary columns
+    # (full rows are served by the results endpoint)
+    job_progress = enhanced_job_manager.get_job_with_progress(job_id)
+    if not job_progress:
         raise HTTPException(status_code=404, detail="Job not found")
-    
-    agent_runs = enhanced_job_manager.get_agent_runs(job_id)
+    job, latest_run = job_progress
+    status, started_at_us, ended_at_us, result_summary, phase_results, completed_agents, run_count = job
+    agent_runs = _agent_runs_summary_json(job_id, run_count) if detail else "[]"
     
     # Calculate progress
-    total_expected_agents = 50  # Approximate total agents in comprehensive pipeline
-    completed_agents = len([r for r in agent_runs if r["status"] in ["success", "completed"]])
-    progress = min((completed_agents / total_expected_agents) * 100, 100.0)
+    progress = min((completed_agents / _EXPECTED_AGENT_COUNT) * 100, 100.0)
     
     # Determine current phase and agent
     current_phase = None
     current_agent = None
-    if agent_runs and job["status"] == "running":
-        latest_run = agent_runs[-1]
-        current_phase = latest_run.get("phase_name")
-        if latest_run["status"] == "running":
-            current_agent = latest_run["agent_name"]
-    
-    return EnhancedJobStatus(
-        job_id=job_id,
-        status=job["status"],
-        started_at=datetime.fromisoformat(job["started_at"]),
-        ended_at=datetime.fromisoformat(job["ended_at"]) if job["ended_at"] else None,
-        progress=progress,
-        current_phase=current_phase,
-        current_agent=current_agent,
-        result_summary=job["result_summary"],
-        agent_runs=agent_runs,
-        phase_results=job["phase_results"]
+    if latest_run and status == "running":
+        current_phase, latest_agent, latest_status = latest_run
+        if latest_status == "running":
+            current_agent = latest_agent
+    
+    # Fixed-shape EnhancedJobStatus body assembled directly: the stored JSON
+    # columns and the cached run list are spliced in without re-encoding
+    started_at = _from_epoch_us(started_at_us).isoformat()
+    ended_at = _from_epoch_us(ended_at_us).isoformat() if ended_at_us is not None else None
+    body = (
+        f'{{"job_id":{_dump_json(job_id)},"status":{_dump_json(status)},'
+        f'"started_at":{_dump_json(started_at)},"ended_at":{_dump_json(ended_at)},'
+        f'"progress":{_dump_json(progress)},'
+        f'"current_phase":{_dump_json(current_phase)},"current_agent":{_dump_json(current_agent)},'
+        f'"result_summary":{result_summary or "{}"},"agent_runs":{agent_runs},'
+        f'"phase_results":{phase_results or "{}"}}}'
     )
+    return Response(content=body.encode(), media_type="application/json")
 
 @app.get("/api/v3/jobs/{job_id}/results")
-async def get_enhanced_job_results(job_id: str):
+def get_enhanced_job_results(job_id: str):
     """Get detailed results from enhanced generation job"""
     
-    job = enhanced_job_manager.get_job(job_id)
+    job = enhanced_job_manager.get_job_encoded(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
+    status, result_summary, phase_results = job
     
-    if job["status"] not in ["completed", "failed"]:
+    if status not in ["completed", "failed"]:
         raise HTTPException(status_code=400, detail="Job not yet completed")
     
-    agent_runs = enhanced_job_manager.get_agent_runs(job_id)
+    agent_runs = enhanced_job_manager.get_agent_runs_detailed(job_id)
+    total_runs, successful_runs, avg_execution_time = enhanced_job_manager.get_run_stats(job_id)
     
-    return {
-        "job_id": job_id,
-        "status": job["status"],
-        "execution_summary": job["result_summary"],
-        "phase_results": job["phase_results"],
-        "agent_execution_details": agent_runs,
-        "privacy_assessments": [r["privacy_assessment"] for r in agent_runs if r["privacy_assessment"]],
-        "clinical_reviews": [r["clinical_review_status"] for r in agent_runs],
-        "performance_metrics": {
-            "total_agents_executed": len(agent_runs),
-            "successful_executions": len([r for r in agent_runs if r["status"] == "success"]),
-            "average_execution_time_ms": sum(r["execution_time_ms"] for r in agent_runs) / len(agent_runs) if agent_runs else 0
-        }
+    # The stored JSON columns are spliced into the response as-is rather than
+    # decoded and re-encoded; each run's scalar fields are encoded with the
+    # assessment appended before the closing brace
+    run_details = []
+    privacy_assessments = []
+    for run in agent_runs:
+        privacy_assessment = run.pop("privacy_assessment")
+        run_details.append(f'{_dump_json(run)[:-1]},"privacy_assessment":{privacy_assessment}}}')
+        if privacy_assessment not in ("{}", "[]", "null"):
+            privacy_assessments.append(privacy_assessment)
+    performance_metrics = {
+        "total_agents_executed": total_runs,
+        "successful_executions": successful_runs,
+        "average_execution_time_ms": avg_execution_time
     }
+    
+    body = (
+        f'{{"job_id":{_dump_json(job_id)},"status":{_dump_json(status)},'
+        f'"execution_summary":{result_summary},"phase_results":{phase_results},'
+        f'"agent_execution_details":[{",".join(run_details)}],'
+        f'"privacy_assessments":[{",".join(privacy_assessments)}],'
+        f'"clinical_reviews":{_dump_json([run["clinical_review_status"] for run in agent_runs])},'
+        f'"performance_metrics":{_dump_json(performance_metrics)}}}'
+    )
+    return Response(content=body.encode(), media_type="application/json")
 
 @app.get("/api/v3/analytics")
-async def get_enhanced_platform_analytics():
+def get_enhanced_platform_analytics():
     """Get analytics for enhanced platform"""
     
-    conn = sqlite3.connect(enhanced_job_manager.db_path)
-    cursor = conn.cursor()
-    
     # Job statistics
-    cursor.execute("SELECT status, COUNT(*) FROM enhanced_jobs GROUP BY status")
-    job_stats = dict(cursor.fetchall())
+    job_stats = enhanced_job_manager.get_job_status_counts()
     
     # Agent performance statistics
-    cursor.execute("""
-        SELECT agent_role, COUNT(*), AVG(execution_time_ms), 
-               SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END) as success_count
-        FROM enhanced_agent_runs 
-        GROUP BY agent_role
-    """)
     agent_performance = [{
         "role": row[0],
         "total_executions": row[1],
         "avg_execution_time_ms": row[2],
-        "success_rate": (row[3] / row[1]) * 100 if row[1] > 0 else 0
-    } for row in cursor.fetchall()]
-    
-    conn.close()
+        "success_rate": row[3]
+    } for row in enhanced_job_manager.get_role_performance()]
     
     return {
         "platform_version": "3.0.0",
-        "analytics_timestamp": datetime.utcnow().isoformat(),
+        "analytics_timestamp": _utc_now_iso(),
         "job_statistics": job_stats,
         "agent_performance_by_role": agent_performance,
-        "architecture_metrics": enhanced_orchestrator.get_agent_architecture_overview(),
+        "architecture_metrics": _arch_overview,
         "system_health": {
             "total_jobs_processed": sum(job_stats.values()),
             "system_uptime": "operational",
@@ -454,9 +881,44 @@ async def get_enhanced_platform_analytics():
 @app.get("/api/v3/architecture")
 async def get_agent_architecture():
     """Get comprehensive agent architecture overview"""
-    return enhanced_orchestrator.get_agent_architecture_overview()
+    return Response(content=_arch_overview_bytes, media_type="application/json")
+
+@app.post("/api/v3/architecture/refresh")
+async def refresh_agent_architecture():
+    """Rebuild the cached architecture overview after the orchestrator changes"""
+    _snapshot_architecture()
+    return {"status": "refreshed", "total_agents": _arch_overview.get("total_agents")}
 
 # Langflow Integration Endpoints
+LANGFLOW_EXPORT_DIR = "exports/langflow"
+LANGFLOW_EXPORT_ZIP = "exports/synthetic_ascension_langflow_export.zip"
+
+# (file snapshot, zip bytes, ETag) for the last ZIP built from the export directory
+_langflow_zip_cache = (None, b"", "")
+
+def _langflow_export_zip():
+    """Return the export directory as ZIP bytes plus an ETag, rebuilding only
+    when a file under it has been added, removed or modified"""
+    global _langflow_zip_cache
+    
+    files = []
+    for root, dirs, filenames in os.walk(LANGFLOW_EXPORT_DIR):
+        for filename in filenames:
+            file_path = os.path.join(root, filename)
+            stat = os.stat(file_path)
+            files.append((file_path, stat.st_mtime_ns, stat.st_size))
+    snapshot = tuple(sorted(files))
+    
+    if snapshot != _langflow_zip_cache[0]:
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED, compresslevel=6) as zipf:
+            for file_path, _, _ in snapshot:
+                zipf.write(file_path, os.path.relpath(file_path, "exports"))
+        content = buffer.getvalue()
+        _langflow_zip_cache = (snapshot, content, f'"{hashlib.sha256(content).hexdigest()}"')
+    
+    return _langflow_zip_cache[1], _langflow_zip_cache[2]
+
 @app.get("/api/v3/langflow/export")
 async def export_langflow_workflows():
     """Export all agent workflows as Langflow-compatible JSON files"""
@@ -465,14 +927,9 @@ async def export_langflow_workflows():
     export_dir = generate_langflow_exports()
     
     # Create ZIP file for download
-    zip_path = "exports/synthetic_ascension_langflow_export.zip"
-    
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for root, dirs, files in os.walk(export_dir):
-            for file in files:
-                file_path = os.path.join(root, file)
-                arcname = os.path.relpath(file_path, "exports")
-                zipf.write(file_path, arcname)
+    content, _ = _langflow_export_zip()
+    with open(LANGFLOW_EXPORT_ZIP, 'wb') as f:
+        f.write(content)
     
     return {
         "status": "success",
@@ -489,54 +946,66 @@ async def export_langflow_workflows():
     }
 
 @app.get("/api/v3/langflow/download")
-async def download_langflow_export():
+async def download_langflow_export(request: Request):
     """Download Langflow export as ZIP file"""
     
-    zip_path = "exports/synthetic_ascension_langflow_export.zip"
-    
-    if not os.path.exists(zip_path):
+    if not os.path.isdir(LANGFLOW_EXPORT_DIR):
         # Generate export if it doesn't exist
         generate_langflow_exports()
-        
-        # Create ZIP file
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            export_dir = "exports/langflow"
-            for root, dirs, files in os.walk(export_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    arcname = os.path.relpath(file_path, "exports")
-                    zipf.write(file_path, arcname)
-    
-    return FileResponse(
-        zip_path,
+    
+    content, etag = _langflow_export_zip()
+    
+    # Clients holding the current ZIP revalidate without a new download
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    return Response(
+        content=content,
         media_type="application/zip",
-        filename="synthetic_ascension_langflow_export.zip"
+        headers={
+            "ETag": etag,
+            "Content-Disposition": 'attachment; filename="synthetic_ascension_langflow_export.zip"'
+        }
     )
 
+@functools.lru_cache(maxsize=64)
+def _read_flow_bytes(flow_path: str, mtime_ns: int) -> bytes:
+    """Read an exported flow file; keyed on mtime so rewrites miss the cache"""
+    with open(flow_path, 'rb') as f:
+        return f.read()
+
 @app.get("/api/v3/langflow/flow/{flow_name}")
-async def get_langflow_flow(flow_name: str):
+async def get_langflow_flow(flow_name: str, request: Request):
     """Get specific Langflow flow JSON"""
     
-    flow_path = f"exports/langflow/{flow_name}.json"
+    flow_path = f"{LANGFLOW_EXPORT_DIR}/{flow_name}.json"
     
     if not os.path.exists(flow_path):
         # Generate if doesn't exist
         generate_langflow_exports()
     
-    if os.path.exists(flow_path):
-        with open(flow_path, 'r') as f:
-            flow_data = json.load(f)
-        return flow_data
-    else:
+    try:
+        stat = os.stat(flow_path)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Flow '{flow_name}' not found")
+    
+    # The exported file is already JSON, so serve its bytes without re-parsing
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    if etag in (tag.strip() for tag in request.headers.get("if-none-match", "").split(",")):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    return Response(
+        content=_read_flow_bytes(flow_path, stat.st_mtime_ns),
+        media_type="application/json",
+        headers={"ETag": etag}
+    )
 
 @app.post("/api/v3/langflow/execute")
-async def execute_langflow_workflow(
-    workflow_data: Dict[str, Any],
-    background_tasks: BackgroundTasks
-):
+async def execute_langflow_workflow(workflow_data: Dict[str, Any]):
     """Execute a Langflow workflow with Synthetic Ascension backend"""
     
+    job_queue = get_job_queue()
     job_id = str(uuid.uuid4())
     
     # Convert Langflow workflow to Synthetic Ascension job
@@ -548,8 +1017,11 @@ async def execute_langflow_workflow(
         agent_selection=workflow_data.get("selected_agents", [])
     )
     
-    # Execute in background
-    background_tasks.add_task(execute_enhanced_generation_pipeline, job_id, request)
+    request_data = request.model_dump()
+    
+    # Create job record so the status URL resolves, then queue execution
+    await asyncio.to_thread(enhanced_job_manager.create_job, job_id, request_data)
+    await enqueue_job(job_queue, job_id, (execute_enhanced_generation_pipeline, (job_id, request_data)))
     
     return {
         "job_id": job_id,
@@ -559,159 +1031,111 @@ async def execute_langflow_workflow(
         "check_status_url": f"/api/v3/jobs/{job_id}"
     }
 
+# Static payload, encoded once
+_LANGFLOW_TEMPLATES_BYTES = _dump_json({
+    "templates": [
+        {
+            "name": "Complete Pipeline",
+            "id": "synthetic_ascension_complete_pipeline", 
+            "description": "Full 6-phase EHR generation with all 50+ agents",
+            "phases": 6,
+            "agent_count": 50,
+            "estimated_runtime": "15-30 minutes",
+            "complexity": "advanced"
+        },
+        {
+            "name": "Cohort Constructor Only",
+            "id": "cohort_constructor_workflow",
+            "description": "Demographics and comorbidity generation",
+            "phases": 1,
+            "agent_count": 11,
+            "estimated_runtime": "5-10 minutes", 
+            "complexity": "beginner"
+        },
+        {
+            "name": "Clinical Journey Focus",
+            "id": "clinical_journey_workflow",
+            "description": "Procedure, medication, and care pathway generation",
+            "phases": 1,
+            "agent_count": 11,
+            "estimated_runtime": "8-15 minutes",
+            "complexity": "intermediate"
+        }
+    ],
+    "langflow_setup_instructions": {
+        "install": "pip install langflow",
+        "run": "langflow run",
+        "import_url": "/api/v3/langflow/download",
+        "backend_connection": "http://localhost:8004"
+    }
+}).encode()
+
 @app.get("/api/v3/langflow/templates")
 async def get_langflow_templates():
     """Get available Langflow workflow templates"""
     
-    return {
-        "templates": [
-            {
-                "name": "Complete Pipeline",
-                "id": "synthetic_ascension_complete_pipeline", 
-                "description": "Full 6-phase EHR generation with all 50+ agents",
-                "phases": 6,
-                "agent_count": 50,
-                "estimated_runtime": "15-30 minutes",
-                "complexity": "advanced"
-            },
-            {
-                "name": "Cohort Constructor Only",
-                "id": "cohort_constructor_workflow",
-                "description": "Demographics and comorbidity generation",
-                "phases": 1,
-                "agent_count": 11,
-                "estimated_runtime": "5-10 minutes", 
-                "complexity": "beginner"
-            },
-            {
-                "name": "Clinical Journey Focus",
-                "id": "clinical_journey_workflow",
-                "description": "Procedure, medication, and care pathway generation",
-                "phases": 1,
-                "agent_count": 11,
-                "estimated_runtime": "8-15 minutes",
-                "complexity": "intermediate"
-            }
-        ],
-        "langflow_setup_instructions": {
-            "install": "pip install langflow",
-            "run": "langflow run",
-            "import_url": "/api/v3/langflow/download",
-            "backend_connection": "http://localhost:8004"
-        }
-    }
+    return Response(content=_LANGFLOW_TEMPLATES_BYTES, media_type="application/json")
 
 # UX-Focused Endpoints for Frontend
 @app.get("/api/ux/dashboard/summary", response_model=DashboardSummary)
-async def get_dashboard_summary():
+def get_dashboard_summary():
     """Get dashboard overview data for main UI"""
-    conn = sqlite3.connect(enhanced_job_manager.db_path)
-    cursor = conn.cursor()
-    
     # Get real statistics
-    cursor.execute("SELECT COUNT(*) FROM enhanced_jobs")
-    total_jobs = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM enhanced_jobs WHERE status = 'running'")
-    active_jobs = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM enhanced_jobs WHERE status = 'completed'")
-    completed_jobs = cursor.fetchone()[0]
+    total_jobs, active_jobs, completed_jobs = enhanced_job_manager.get_dashboard_counts()
     
     # Estimate total patients (assuming avg 100 per job)
     total_patients = completed_jobs * 100
     
-    conn.close()
-    
     return DashboardSummary(
         total_jobs=total_jobs,
         active_jobs=active_jobs,
         completed_jobs=completed_jobs,
         total_patients_generated=total_patients,
         system_status="healthy",
-        last_updated=datetime.utcnow()
+        last_updated=_utc_now_iso()
     )
 
 @app.get("/api/ux/dashboard/recent-jobs", response_model=List[JobCard])
-async def get_recent_jobs(limit: int = 5):
+def get_recent_jobs(limit: int = 5):
     """Get recent jobs for dashboard display"""
-    conn = sqlite3.connect(enhanced_job_manager.db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT job_id, status, progress, current_phase, started_at, result_summary
-        FROM enhanced_jobs 
-        ORDER BY started_at DESC 
-        LIMIT ?
-    """, (limit,))
-    
     jobs = []
-    for row in cursor.fetchall():
-        result_summary = json.loads(row[5]) if row[5] else {}
+    for row in enhanced_job_manager.get_recent_jobs(limit):
         jobs.append(JobCard(
             job_id=row[0],
             job_name=f"EHR Generation - {row[0][:8]}",
             status=row[1],
             progress=row[2],
             current_phase=row[3],
-            started_at=datetime.fromisoformat(row[4]),
+            started_at=_from_epoch_us(row[4]),
             estimated_completion=None,
-            population_size=result_summary.get("population_size", 100),
-            condition=result_summary.get("condition", "general")
+            population_size=row[5],
+            condition=row[6]
         ))
     
-    conn.close()
     return jobs
 
 @app.get("/api/ux/agents/status", response_model=List[AgentStatusCard])
-async def get_agent_status():
+def get_agent_status():
     """Get agent status for monitoring dashboard"""
-    conn = sqlite3.connect(enhanced_job_manager.db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT agent_name, agent_role, 
-               COUNT(*) as total_executions,
-               AVG(execution_time_ms) as avg_time,
-               SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END) as success_count,
-               MAX(ran_at) as last_execution
-        FROM enhanced_agent_runs 
-        GROUP BY agent_name, agent_role
-        ORDER BY total_executions DESC
-        LIMIT 10
-    """)
-    
     agents = []
-    for row in cursor.fetchall():
-        success_rate = (row[4] / row[2] * 100) if row[2] > 0 else 0
+    for row in enhanced_job_manager.get_agent_status_rows():
         agents.append(AgentStatusCard(
             agent_name=row[0].replace("_", " ").title(),
             agent_type=row[1].title(),
             status="active" if row[5] else "idle",
-            last_execution=datetime.fromisoformat(row[5]) if row[5] else None,
-            success_rate=success_rate,
-            avg_execution_time=row[3] / 1000 if row[3] else 0,  # Convert to seconds
+            last_execution=row[5],
+            success_rate=row[4],
+            avg_execution_time=row[3],
             total_executions=row[2]
         ))
     
-    conn.close()
     return agents
 
 @app.get("/api/ux/system/metrics", response_model=SystemMetrics)
-async def get_system_metrics():
+def get_system_metrics():
     """Get system performance metrics for monitoring UI"""
-    conn = sqlite3.connect(enhanced_job_manager.db_path)
-    cursor = conn.cursor()
-    
-    # Get active agents count
-    cursor.execute("SELECT COUNT(DISTINCT agent_name) FROM enhanced_agent_runs WHERE ran_at > datetime('now', '-1 hour')")
-    active_agents = cursor.fetchone()[0]
-    
-    # Get queue depth (running jobs)
-    cursor.execute("SELECT COUNT(*) FROM enhanced_jobs WHERE status = 'running'")
-    queue_depth = cursor.fetchone()[0]
-    
-    conn.close()
+    # Active agents in the last hour and queue depth (running jobs)
+    active_agents, queue_depth = enhanced_job_manager.get_system_counts()
     
     return SystemMetrics(
         cpu_usage=45.2,  # Mock values - integrate with actual system monitoring
@@ -722,63 +1146,84 @@ async def get_system_metrics():
         system_uptime="5d 12h 34m"
     )
 
+# Static payload, encoded once
+_AGENT_CATEGORIES_BYTES = _dump_json({
+    "categories": [
+        {
+            "name": "Cohort Constructor",
+            "agent_count": 11,
+            "description": "Demographics and population modeling",
+            "color": "#3B82F6"
+        },
+        {
+            "name": "Clinical Journey",
+            "agent_count": 11,
+            "description": "Healthcare pathways and encounters",
+            "color": "#10B981"
+        },
+        {
+            "name": "Data Robustness",
+            "agent_count": 10,
+            "description": "Noise injection and privacy protection",
+            "color": "#F59E0B"
+        },
+        {
+            "name": "QA & Validation",
+            "agent_count": 13,
+            "description": "Quality assurance and compliance",
+            "color": "#EF4444"
+        },
+        {
+            "name": "Explanation",
+            "agent_count": 13,
+            "description": "Reporting and provenance tracking",
+            "color": "#8B5CF6"
+        },
+        {
+            "name": "Supervision",
+            "agent_count": 9,
+            "description": "Orchestration and monitoring",
+            "color": "#6B7280"
+        }
+    ]
+}).encode()
+
 @app.get("/api/ux/agents/categories")
 async def get_agent_categories():
     """Get agent categories for UI organization"""
-    return {
-        "categories": [
-            {
-                "name": "Cohort Constructor",
-                "agent_count": 11,
-                "description": "Demographics and population modeling",
-                "color": "#3B82F6"
-            },
-            {
-                "name": "Clinical Journey",
-                "agent_count": 11,
-                "description": "Healthcare pathways and encounters",
-                "color": "#10B981"
-            },
-            {
-                "name": "Data Robustness",
-                "agent_count": 10,
-                "description": "Noise injection and privacy protection",
-                "color": "#F59E0B"
-            },
-            {
-                "name": "QA & Validation",
-                "agent_count": 13,
-                "description": "Quality assurance and compliance",
-                "color": "#EF4444"
-            },
-            {
-                "name": "Explanation",
-                "agent_count": 13,
-                "description": "Reporting and provenance tracking",
-                "color": "#8B5CF6"
-            },
-            {
-                "name": "Supervision",
-                "agent_count": 9,
-                "description": "Orchestration and monitoring",
-                "color": "#6B7280"
-            }
-        ]
-    }
+    return Response(content=_AGENT_CATEGORIES_BYTES, media_type="application/json")
+
+# Only last_check varies, so the payload is encoded once up to that field
+_SYSTEM_HEALTH_PREFIX = _dump_json({
+    "overall_status": "healthy",
+    "components": [
+        {"name": "Enhanced Backend V3", "status": "online", "port": 8004},
+        {"name": "Database", "status": "online", "connection_pool": "healthy"},
+        {"name": "Agent Orchestrator", "status": "online", "active_agents": 8},
+        {"name": "Privacy Guards", "status": "online", "assessments_passing": True},
+        {"name": "Clinical Review", "status": "online", "human_reviewers": 3}
+    ]
+}).encode()[:-1] + b',"last_check":"'
 
 @app.get("/api/ux/system/health")
 async def get_system_health():
     """Get detailed system health status"""
+    return Response(
+        content=_SYSTEM_HEALTH_PREFIX + _utc_now_iso().encode() + b'"}',
+        media_type="application/json"
+    )
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness check reporting pipeline queue depth; 503 once the queue is full"""
+    job_queue = app.state.job_queue
+    if job_queue.full():
+        raise HTTPException(status_code=503, detail="Pipeline queue is full")
     return {
-        "overall_status": "healthy",
-        "components": [
-            {"name": "Enhanced Backend V3", "status": "online", "port": 8004},
-            {"name": "Database", "status": "online", "connection_pool": "healthy"},
-            {"name": "Agent Orchestrator", "status": "online", "active_agents": 8},
-            {"name": "Privacy Guards", "status": "online", "assessments_passing": True},
-            {"name": "Clinical Review", "status": "online", "human_reviewers": 3}
-        ],
-        "last_check": datetime.utcnow().isoformat()
+        "status": "ok",
+        "queue_depth": job_queue.qsize(),
+        "queue_capacity": job_queue.maxsize,
+        "workers": PIPELINE_WORKERS
     }
 
 if __name__ == "__main__":
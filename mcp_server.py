@@ -5,10 +5,9 @@ Exposes EHR generation capabilities via Model Context Protocol
 
 from fastmcp import FastMCP
 from typing import Dict, List, Any, Optional
-import json
 import uuid
-import random
 from datetime import datetime
+import numpy as np
 from pydantic import BaseModel
 
 class PatientGenerationConfig(BaseModel):
@@ -26,10 +25,71 @@ class CohortSummary(BaseModel):
 # Initialize MCP server
 mcp = FastMCP("Synthetic Ascension EHR Generator")
 
-# In-memory storage for demo
+# In-memory storage for demo. Cohorts are held column-wise: one NumPy array
+# per patient field, categoricals as codes into the tuples below, and each
+# patient's conditions as a CSR slice (condition_indptr[i]:condition_indptr[i+1])
+# of condition_codes. Patient dicts are only built when a tool returns them.
 generated_cohorts = {}
 active_workflows = {}
 
+# Listing summaries for generated_cohorts, appended as each cohort is stored
+_cohort_index: List[Dict[str, Any]] = []
+
+# Categorical values sampled for each synthetic patient
+_GENDERS = ("Male", "Female")
+_ETHNICITIES = ("Caucasian", "Hispanic", "African American", "Asian", "Other")
+_INSURANCE_TYPES = ("Medicare", "Medicaid", "Private", "Uninsured")
+_LOCATIONS = ("Urban", "Suburban", "Rural")
+
+_rng = np.random.default_rng()
+
+def _cohort_patients(cohort: Dict[str, Any], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Materialize patient dicts from a cohort's columns (the first ``limit``, or all)"""
+    columns = cohort["columns"]
+    n = len(columns["age"]) if limit is None else min(limit, len(columns["age"]))
+    
+    # Slices go through .tolist() so the dicts hold plain Python values
+    field = {
+        name: values[:n].tolist()
+        for name, values in columns.items() if not name.startswith("condition_")
+    }
+    indptr = columns["condition_indptr"][:n + 1].tolist()
+    codes = columns["condition_codes"][:indptr[-1]].tolist()
+    condition_list = cohort["metadata"]["configuration"]["conditions"]
+    specialty_list = cohort["metadata"]["configuration"]["specialties"]
+    created_at = cohort["created_at"]
+    
+    return [
+        {
+            "patient_id": f"PAT-{field['patient_id'][i]:08X}",
+            "name": f"Patient {i+1:03d}",
+            "age": field["age"][i],
+            "gender": _GENDERS[field["gender"][i]],
+            "conditions": [condition_list[c] for c in codes[indptr[i]:indptr[i + 1]]],
+            "vitals": {
+                "blood_pressure": f"{field['systolic'][i]}/{field['diastolic'][i]}",
+                "heart_rate": field["heart_rate"][i],
+                "temperature": field["temperature"][i],
+                "respiratory_rate": field["respiratory_rate"][i]
+            },
+            "demographics": {
+                "ethnicity": _ETHNICITIES[field["ethnicity"][i]],
+                "insurance": _INSURANCE_TYPES[field["insurance"][i]],
+                "location": _LOCATIONS[field["location"][i]]
+            },
+            "specialties": specialty_list,
+            "created_at": created_at
+        }
+        for i in range(n)
+    ]
+
+def _cohort_export(cohort: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the full patients-plus-metadata view of a stored cohort"""
+    return {
+        "patients": _cohort_patients(cohort),
+        "metadata": cohort["metadata"]
+    }
+
 @mcp.tool()
 def generate_synthetic_patients(
     population_size: int = 100,
@@ -66,38 +126,42 @@ def generate_synthetic_patients(
     # Generate workflow ID
     workflow_id = str(uuid.uuid4())
     
-    # Generate synthetic patients
-    patients = []
-    for i in range(population_size):
-        patient_id = f"PAT-{uuid.uuid4().hex[:8].upper()}"
-        
-        patient = {
-            "patient_id": patient_id,
-            "name": f"Patient {i+1:03d}",
-            "age": random.randint(age_min, age_max),
-            "gender": random.choice(["Male", "Female"]),
-            "conditions": random.sample(condition_list, min(len(condition_list), random.randint(1, 3))) if condition_list else [],
-            "vitals": {
-                "blood_pressure": f"{random.randint(90, 140)}/{random.randint(60, 90)}",
-                "heart_rate": random.randint(60, 100),
-                "temperature": round(random.uniform(98.0, 100.4), 1),
-                "respiratory_rate": random.randint(12, 20)
-            },
-            "demographics": {
-                "ethnicity": random.choice(["Caucasian", "Hispanic", "African American", "Asian", "Other"]),
-                "insurance": random.choice(["Medicare", "Medicaid", "Private", "Uninsured"]),
-                "location": random.choice(["Urban", "Suburban", "Rural"])
-            },
-            "specialties": specialty_list,
-            "created_at": datetime.now().isoformat()
-        }
-        patients.append(patient)
+    # Generate synthetic patients: every field is drawn for the whole cohort
+    # at once and stored as a column
+    n = population_size
+    columns = {
+        # 8 hex digits per patient ID, drawn as one block of random bytes
+        "patient_id": np.frombuffer(_rng.bytes(4 * n), dtype=">u4"),
+        "age": _rng.integers(age_min, age_max + 1, size=n),
+        "gender": _rng.integers(len(_GENDERS), size=n, dtype=np.uint8),
+        "systolic": _rng.integers(90, 141, size=n),
+        "diastolic": _rng.integers(60, 91, size=n),
+        "heart_rate": _rng.integers(60, 101, size=n),
+        "temperature": np.round(_rng.uniform(98.0, 100.4, size=n), 1),
+        "respiratory_rate": _rng.integers(12, 21, size=n),
+        "ethnicity": _rng.integers(len(_ETHNICITIES), size=n, dtype=np.uint8),
+        "insurance": _rng.integers(len(_INSURANCE_TYPES), size=n, dtype=np.uint8),
+        "location": _rng.integers(len(_LOCATIONS), size=n, dtype=np.uint8)
+    }
+    
+    # Each patient gets 1-3 distinct conditions: rank a random key per
+    # condition and keep the first k of each row, flattened row by row
+    if condition_list:
+        condition_counts = np.minimum(len(condition_list), _rng.integers(1, 4, size=n))
+        condition_order = np.argsort(_rng.random((n, len(condition_list))), axis=1)
+        keep = np.arange(len(condition_list)) < condition_counts[:, None]
+        columns["condition_codes"] = condition_order[keep]
+        columns["condition_indptr"] = np.concatenate(([0], np.cumsum(condition_counts)))
+    else:
+        columns["condition_codes"] = np.zeros(0, dtype=np.intp)
+        columns["condition_indptr"] = np.zeros(n + 1, dtype=np.intp)
     
     # Store generated cohort
-    generated_cohorts[workflow_id] = {
-        "patients": patients,
+    cohort = {
+        "columns": columns,
+        "created_at": datetime.now().isoformat(),
         "metadata": {
-            "total_patients": len(patients),
+            "total_patients": n,
             "generation_time": datetime.now().isoformat(),
             "configuration": {
                 "population_size": population_size,
@@ -107,18 +171,26 @@ def generate_synthetic_patients(
             }
         }
     }
+    generated_cohorts[workflow_id] = cohort
+    _cohort_index.append({
+        "workflow_id": workflow_id,
+        "patient_count": n,
+        "created_at": cohort["metadata"]["generation_time"],
+        "conditions": condition_list,
+        "specialties": specialty_list
+    })
     
     return {
         "workflow_id": workflow_id,
         "status": "completed",
         "summary": {
-            "total_patients": len(patients),
+            "total_patients": n,
             "conditions_included": condition_list,
             "demographics_range": f"Ages {age_min}-{age_max}",
             "specialties_focus": specialty_list,
             "generation_timestamp": datetime.now().isoformat()
         },
-        "sample_patients": patients[:3]  # Show first 3 as examples
+        "sample_patients": _cohort_patients(cohort, limit=3)  # Show first 3 as examples
     }
 
 @mcp.tool()
@@ -135,7 +207,7 @@ def get_cohort_details(workflow_id: str) -> Dict[str, Any]:
     if workflow_id not in generated_cohorts:
         return {"error": f"Cohort with ID {workflow_id} not found"}
     
-    return generated_cohorts[workflow_id]
+    return _cohort_export(generated_cohorts[workflow_id])
 
 @mcp.tool()
 def list_available_cohorts() -> Dict[str, Any]:
@@ -145,19 +217,9 @@ def list_available_cohorts() -> Dict[str, Any]:
     Returns:
         Summary of all generated cohorts with basic metadata
     """
-    cohorts = []
-    for workflow_id, cohort_data in generated_cohorts.items():
-        cohorts.append({
-            "workflow_id": workflow_id,
-            "patient_count": len(cohort_data["patients"]),
-            "created_at": cohort_data["metadata"]["generation_time"],
-            "conditions": cohort_data["metadata"]["configuration"]["conditions"],
-            "specialties": cohort_data["metadata"]["configuration"]["specialties"]
-        })
-    
     return {
-        "total_cohorts": len(cohorts),
-        "cohorts": cohorts
+        "total_cohorts": len(_cohort_index),
+        "cohorts": _cohort_index
     }
 
 @mcp.tool()
@@ -174,45 +236,27 @@ def analyze_cohort_demographics(workflow_id: str) -> Dict[str, Any]:
     if workflow_id not in generated_cohorts:
         return {"error": f"Cohort with ID {workflow_id} not found"}
     
-    patients = generated_cohorts[workflow_id]["patients"]
+    cohort = generated_cohorts[workflow_id]
+    columns = cohort["columns"]
+    n = len(columns["age"])
     
-    # Analyze demographics
-    age_groups = {"18-30": 0, "31-50": 0, "51-70": 0, "70+": 0}
-    gender_dist = {"Male": 0, "Female": 0}
-    ethnicity_dist = {}
-    insurance_dist = {}
-    condition_freq = {}
+    def distribution(codes: np.ndarray, labels) -> Dict[str, int]:
+        """Count each label's code, dropping labels that never occur"""
+        counts = np.bincount(codes, minlength=len(labels)).tolist()
+        return {label: count for label, count in zip(labels, counts) if count}
     
-    for patient in patients:
-        # Age groups
-        age = patient["age"]
-        if age <= 30:
-            age_groups["18-30"] += 1
-        elif age <= 50:
-            age_groups["31-50"] += 1
-        elif age <= 70:
-            age_groups["51-70"] += 1
-        else:
-            age_groups["70+"] += 1
-        
-        # Gender
-        gender_dist[patient["gender"]] += 1
-        
-        # Ethnicity
-        ethnicity = patient["demographics"]["ethnicity"]
-        ethnicity_dist[ethnicity] = ethnicity_dist.get(ethnicity, 0) + 1
-        
-        # Insurance
-        insurance = patient["demographics"]["insurance"]
-        insurance_dist[insurance] = insurance_dist.get(insurance, 0) + 1
-        
-        # Conditions
-        for condition in patient["conditions"]:
-            condition_freq[condition] = condition_freq.get(condition, 0) + 1
+    # Analyze demographics: ages are bucketed at 30/50/70 and every
+    # categorical column is counted by code
+    age_counts = np.bincount(np.digitize(columns["age"], [31, 51, 71]), minlength=4).tolist()
+    age_groups = dict(zip(("18-30", "31-50", "51-70", "70+"), age_counts))
+    gender_dist = dict(zip(_GENDERS, np.bincount(columns["gender"], minlength=len(_GENDERS)).tolist()))
+    ethnicity_dist = distribution(columns["ethnicity"], _ETHNICITIES)
+    insurance_dist = distribution(columns["insurance"], _INSURANCE_TYPES)
+    condition_freq = distribution(columns["condition_codes"], cohort["metadata"]["configuration"]["conditions"])
     
     return {
         "cohort_id": workflow_id,
-        "total_patients": len(patients),
+        "total_patients": n,
         "demographics": {
             "age_distribution": age_groups,
             "gender_distribution": gender_dist,
@@ -221,7 +265,7 @@ def analyze_cohort_demographics(workflow_id: str) -> Dict[str, Any]:
         },
         "clinical_characteristics": {
             "condition_frequency": condition_freq,
-            "average_conditions_per_patient": sum(len(p["conditions"]) for p in patients) / len(patients)
+            "average_conditions_per_patient": len(columns["condition_codes"]) / n
         },
         "analysis_timestamp": datetime.now().isoformat()
     }
@@ -244,16 +288,17 @@ def export_cohort_data(workflow_id: str, format: str = "json") -> Dict[str, Any]
     cohort_data = generated_cohorts[workflow_id]
     
     if format == "json":
-        return cohort_data
+        return _cohort_export(cohort_data)
     
     elif format == "summary":
-        patients = cohort_data["patients"]
+        columns = cohort_data["columns"]
+        condition_list = cohort_data["metadata"]["configuration"]["conditions"]
         return {
             "summary": {
                 "cohort_id": workflow_id,
-                "total_patients": len(patients),
-                "age_range": f"{min(p['age'] for p in patients)}-{max(p['age'] for p in patients)}",
-                "conditions": list(set(c for p in patients for c in p["conditions"])),
+                "total_patients": cohort_data["metadata"]["total_patients"],
+                "age_range": f"{columns['age'].min()}-{columns['age'].max()}",
+                "conditions": [condition_list[c] for c in np.unique(columns["condition_codes"]).tolist()],
                 "export_timestamp": datetime.now().isoformat()
             }
         }
@@ -276,7 +321,7 @@ def export_cohort_data(workflow_id: str, format: str = "json") -> Dict[str, Any]
                 "location",
                 "created_at"
             ],
-            "total_rows": len(cohort_data["patients"]),
+            "total_rows": cohort_data["metadata"]["total_patients"],
             "note": "Use get_cohort_details to retrieve full data for CSV generation"
         }
     
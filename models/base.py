@@ -0,0 +1,8 @@
+"""
+Shared declarative base for the synthetic EHR database models
+Every model module maps onto this one Base so all tables share a single metadata
+"""
+
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
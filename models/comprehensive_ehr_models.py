@@ -4,23 +4,36 @@ Comprehensive EHR Database Models
 Supporting complete electronic health record structure as per healthcare standards
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, JSON, ForeignKey
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, sessionmaker
-from sqlalchemy import create_engine
-from datetime import datetime
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Text, Boolean, JSON, ForeignKey, Index, UniqueConstraint, text
+from sqlalchemy.orm import relationship, sessionmaker, scoped_session, Session, deferred, raiseload, selectinload, validates
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy import DDL, MetaData, Table, bindparam, create_engine, event, func, insert, inspect, make_url, select, update
+from sqlalchemy.dialects.postgresql import JSONB, UUID, insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from datetime import date, datetime, timedelta
 from typing import Dict, List, Any, Optional
+from functools import lru_cache
+import uuid
 import os
 
-Base = declarative_base()
+from .base import Base
+
+# JSONB (GIN-indexable) on PostgreSQL, plain JSON elsewhere
+IndexedJSON = JSON().with_variant(JSONB(), "postgresql")
+
+def _address_columns(address: Optional[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+    """Filterable Patient columns copied out of the address JSON"""
+    address = address or {}
+    return {"state": address.get("state"), "zip": address.get("zip")}
 
 class Patient(Base):
     """Core patient demographics and identifiers"""
     __tablename__ = "patients"
     
-    id = Column(Integer, primary_key=True, index=True)
-    patient_id = Column(String, unique=True, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    patient_id = Column(String, unique=True, index=True)  # External synthetic ID; child tables join on id
     medical_record_number = Column(String, unique=True, index=True)
+    synthetic_cohort_id = Column(String, index=True)  # Generation run this patient belongs to
     
     # Patient Demographics (Complete)
     full_name = Column(String)
@@ -32,6 +45,8 @@ class Patient(Base):
     
     # Contact Information
     address = Column(JSON)  # street, city, state, zip, country
+    state = Column(String(2), index=True)  # Copied from address for filtering
+    zip = Column(String(10), index=True)  # Copied from address for filtering
     phone = Column(String)
     email = Column(String)
     emergency_contact = Column(JSON)
@@ -54,23 +69,51 @@ class Patient(Base):
     bmi_percentile = Column(Float)
     head_circumference_cm = Column(Float, nullable=True)
     
+    # Chart Summary (denormalized for the dashboard; maintained on flush, see below)
+    active_problem_count = Column(Integer, default=0, nullable=False)
+    active_med_count = Column(Integer, default=0, nullable=False)
+    last_encounter_date = Column(Date, nullable=True)
+    last_vitals_json = Column(JSON, nullable=True)
+    
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    
-    # Relationships to other EHR components will be defined after all classes
+    version_id = Column(Integer, nullable=False, default=1)  # Optimistic lock counter
+
+    __mapper_args__ = {"version_id_col": version_id}
+    
+    # Relationships to other EHR components. Collections load with "selectin":
+    # one SELECT ... WHERE patient_id IN (...) per relationship covers every
+    # patient in the result, instead of a lazy SELECT per patient per chart section
+    problems = relationship("ProblemList", back_populates="patient", lazy="selectin")
+    allergies = relationship("Allergy", back_populates="patient", lazy="selectin")
+    lab_panels = relationship("LabPanel", back_populates="patient", lazy="selectin")
+    medications = relationship("Medication", back_populates="patient", lazy="selectin")
+    imaging_studies = relationship("ImagingStudy", back_populates="patient", lazy="selectin")
+    encounters = relationship("ClinicalEncounter", back_populates="patient", lazy="selectin")
+    procedures = relationship("Procedure", back_populates="patient", lazy="selectin")
+    immunizations = relationship("Immunization", back_populates="patient", lazy="selectin")
+    family_history = relationship("FamilyHistory", back_populates="patient", lazy="selectin")
+    care_team_members = relationship("CareTeamMember", back_populates="patient", lazy="selectin")
+    clinical_notes = relationship("ClinicalNote", back_populates="patient", lazy="selectin")
+
+    @validates("address")
+    def _sync_address_columns(self, key, address):
+        for column, value in _address_columns(address).items():
+            setattr(self, column, value)
+        return address
 
 class ProblemList(Base):
     """Active diagnoses and chronic conditions with ICD-10 codes"""
     __tablename__ = "problem_list"
     
     id = Column(Integer, primary_key=True, index=True)
-    patient_id = Column(String, ForeignKey("patients.patient_id"))
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id"), index=True)
     
     condition = Column(String)
     icd10_code = Column(String)
-    onset_date = Column(String)
-    resolution_date = Column(String, nullable=True)
+    onset_date = Column(Date)
+    resolution_date = Column(Date, nullable=True)
     status = Column(String)  # Active, Resolved, Chronic, Inactive
     severity = Column(String)  # Mild, Moderate, Severe
     certainty = Column(String)  # Confirmed, Suspected, Rule-out
@@ -85,13 +128,13 @@ class Allergy(Base):
     __tablename__ = "allergies"
     
     id = Column(Integer, primary_key=True, index=True)
-    patient_id = Column(String, ForeignKey("patients.patient_id"))
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id"), index=True)
     
     allergen = Column(String)
     allergen_type = Column(String)  # Medication, Food, Environmental
     reaction = Column(Text)  # Rash, Anaphylaxis, Nausea, etc.
     severity = Column(String)  # Mild, Moderate, Severe, Life-threatening
-    onset_date = Column(String)
+    onset_date = Column(Date)
     confirmation_status = Column(String)  # Confirmed, Suspected, Unconfirmed
     triage_recommendation = Column(Text)
     
@@ -102,22 +145,26 @@ class Allergy(Base):
 class LabPanel(Base):
     """Laboratory test panels with LOINC codes and time-series results"""
     __tablename__ = "lab_panels"
+    __table_args__ = (
+        Index("ix_labs_patient_date", "patient_id", "resulted_date", "panel_name",
+              postgresql_include=["status"]),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    patient_id = Column(String, ForeignKey("patients.patient_id"))
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id"), index=True)
     
     panel_name = Column(String)
     loinc_code = Column(String)
-    ordered_date = Column(String)
-    collected_date = Column(String)
-    resulted_date = Column(String)
+    ordered_date = Column(Date)
+    collected_date = Column(Date)
+    resulted_date = Column(Date)
     ordering_provider = Column(String)
     status = Column(String)  # Pending, Final, Corrected, Cancelled
     
     created_at = Column(DateTime, default=datetime.utcnow)
     
     patient = relationship("Patient", back_populates="lab_panels")
-    results = relationship("LabResult", back_populates="panel", cascade="all, delete-orphan")
+    results = relationship("LabResult", back_populates="panel", cascade="all, delete-orphan", lazy="selectin")
 
 class LabResult(Base):
     """Individual lab test results within panels"""
@@ -137,20 +184,27 @@ class LabResult(Base):
 class Medication(Base):
     """Current and past medications with RxNorm codes"""
     __tablename__ = "medications"
+    __table_args__ = (
+        Index("ix_meds_active", "patient_id", postgresql_where=text("status = 'Active'")),
+        Index("ix_meds_patient_status_date", "patient_id", "status", "start_date",
+              postgresql_include=["name"]),
+        UniqueConstraint("patient_id", "rxnorm_code", "start_date", name="uq_medication_order"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    patient_id = Column(String, ForeignKey("patients.patient_id"))
+    # uq_medication_order columns are NOT NULL: NULLs never conflict, so they would defeat dedup
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id"), index=True, nullable=False)
     
     name = Column(String)
-    rxnorm_code = Column(String)
+    rxnorm_code = Column(String, nullable=False, default="")  # "" when uncoded
     generic_name = Column(String)
     brand_name = Column(String)
     dosage = Column(String)
     dose_amount = Column(String)
     route = Column(String)  # PO, IV, IM, etc.
     frequency = Column(String)
-    start_date = Column(String)
-    stop_date = Column(String, nullable=True)
+    start_date = Column(Date, nullable=False)
+    stop_date = Column(Date, nullable=True)
     prescriber = Column(String)
     indication = Column(Text)
     status = Column(String)  # Active, Discontinued, Held, Completed
@@ -167,23 +221,28 @@ class Medication(Base):
 class ImagingStudy(Base):
     """Radiology studies, echocardiograms, and diagnostic imaging"""
     __tablename__ = "imaging_studies"
+    __table_args__ = (
+        Index("ix_imaging_findings_gin", "findings", postgresql_using="gin"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    patient_id = Column(String, ForeignKey("patients.patient_id"))
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id"), index=True)
     
     study_type = Column(String)
     modality = Column(String)  # X-ray, CT, MRI, Ultrasound, Echo
-    study_date = Column(String)
+    study_date = Column(Date)
     ordering_provider = Column(String)
     performing_technologist = Column(String)
     interpreting_radiologist = Column(String)
     status = Column(String)
     indication = Column(Text)
-    technique = Column(Text)
-    findings = Column(JSON)  # Structured findings
-    impression = Column(Text)
-    recommendations = Column(Text)
-    comparison = Column(Text)
+    
+    # Report body; deferred so study lists skip it (undefer_group("report") for detail views)
+    technique = deferred(Column(Text), group="report")
+    findings = deferred(Column(IndexedJSON), group="report")  # Structured findings
+    impression = deferred(Column(Text), group="report")
+    recommendations = deferred(Column(Text), group="report")
+    comparison = deferred(Column(Text), group="report")
     
     created_at = Column(DateTime, default=datetime.utcnow)
     
@@ -192,12 +251,17 @@ class ImagingStudy(Base):
 class ClinicalEncounter(Base):
     """All clinical visits and encounters"""
     __tablename__ = "clinical_encounters"
+    __table_args__ = (
+        Index("ix_encounters_patient_date", "patient_id", "date",
+              postgresql_include=["encounter_id", "encounter_type"]),
+        Index("ix_encounters_billing_gin", "billing_codes", postgresql_using="gin"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    patient_id = Column(String, ForeignKey("patients.patient_id"))
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id"), index=True)
     
     encounter_id = Column(String, unique=True)
-    date = Column(String)
+    date = Column(Date)
     time = Column(String)
     encounter_type = Column(String)  # Inpatient, Outpatient, Emergency, Telehealth
     department = Column(String)
@@ -220,13 +284,13 @@ class ClinicalEncounter(Base):
     patient_education = Column(Text)
     
     # Administrative
-    billing_codes = Column(JSON)
+    billing_codes = Column(IndexedJSON)
     next_appointment = Column(String, nullable=True)
     
     created_at = Column(DateTime, default=datetime.utcnow)
     
     patient = relationship("Patient", back_populates="encounters")
-    vital_signs = relationship("VitalSigns", back_populates="encounter", cascade="all, delete-orphan")
+    vital_signs = relationship("VitalSigns", back_populates="encounter", cascade="all, delete-orphan", lazy="selectin")
 
 class VitalSigns(Base):
     """Vital signs measurements during encounters"""
@@ -254,21 +318,21 @@ class Procedure(Base):
     __tablename__ = "procedures"
     
     id = Column(Integer, primary_key=True, index=True)
-    patient_id = Column(String, ForeignKey("patients.patient_id"))
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id"), index=True)
     
     procedure_name = Column(String)
     cpt_code = Column(String)
-    procedure_date = Column(String)
+    procedure_date = Column(Date)
     location = Column(String)
     surgeon_operator = Column(String)
     assistant = Column(String, nullable=True)
     anesthesia_type = Column(String)
     indication = Column(Text)
-    procedure_details = Column(Text)
+    procedure_details = deferred(Column(Text), group="report")
     complications = Column(Text)
     outcome = Column(Text)
-    post_op_course = Column(Text)
-    pathology_report = Column(Text, nullable=True)
+    post_op_course = deferred(Column(Text), group="report")
+    pathology_report = deferred(Column(Text, nullable=True), group="report")
     follow_up_required = Column(Text)
     
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -278,15 +342,20 @@ class Procedure(Base):
 class Immunization(Base):
     """Vaccination records with manufacturer and lot tracking"""
     __tablename__ = "immunizations"
+    __table_args__ = (
+        UniqueConstraint("patient_id", "vaccine_name", "date_administered", "lot_number",
+                         name="uq_immunization_dose"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    patient_id = Column(String, ForeignKey("patients.patient_id"))
+    # uq_immunization_dose columns are NOT NULL: NULLs never conflict, so they would defeat dedup
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id"), index=True, nullable=False)
     
-    vaccine_name = Column(String)
-    date_administered = Column(String)
+    vaccine_name = Column(String, nullable=False)
+    date_administered = Column(Date, nullable=False)
     dose_number = Column(String)
     manufacturer = Column(String)
-    lot_number = Column(String)
+    lot_number = Column(String, nullable=False, default="")  # "" when the lot is unknown
     route = Column(String)  # IM, SubQ, Intranasal, etc.
     site = Column(String)  # Left deltoid, Right thigh, etc.
     administered_by = Column(String)
@@ -301,7 +370,7 @@ class FamilyHistory(Base):
     __tablename__ = "family_history"
     
     id = Column(Integer, primary_key=True, index=True)
-    patient_id = Column(String, ForeignKey("patients.patient_id"))
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id"), index=True)
     
     family_relationship = Column(String)  # Mother, Father, Maternal Grandmother, etc.
     condition = Column(String)
@@ -318,7 +387,7 @@ class AdvanceDirective(Base):
     __tablename__ = "advance_directives"
     
     id = Column(Integer, primary_key=True, index=True)
-    patient_id = Column(String, ForeignKey("patients.patient_id"))
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id"), index=True)
     
     code_status = Column(String)  # Full Code, DNR, DNI, etc.
     healthcare_proxy = Column(String)
@@ -329,13 +398,16 @@ class AdvanceDirective(Base):
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version_id = Column(Integer, nullable=False, default=1)  # Optimistic lock counter
+
+    __mapper_args__ = {"version_id_col": version_id}
 
 class CareTeamMember(Base):
     """Multidisciplinary care team members"""
     __tablename__ = "care_team_members"
     
     id = Column(Integer, primary_key=True, index=True)
-    patient_id = Column(String, ForeignKey("patients.patient_id"))
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id"), index=True)
     
     provider_name = Column(String)
     specialty = Column(String)
@@ -354,71 +426,533 @@ class ClinicalNote(Base):
     __tablename__ = "clinical_notes"
     
     id = Column(Integer, primary_key=True, index=True)
-    patient_id = Column(String, ForeignKey("patients.patient_id"))
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id"), index=True)
     encounter_id = Column(String, ForeignKey("clinical_encounters.encounter_id"), nullable=True)
     
     note_type = Column(String)  # Progress Note, Consultation, Discharge Summary, etc.
     author = Column(String)
     note_date = Column(String)
     subject = Column(String)
-    note_text = Column(Text)
+    
+    # Note body, deferred so note lists load metadata only (undefer_group("body") for detail views)
+    note_text = deferred(Column(Text), group="body")
     
     # SOAP Format
-    subjective = Column(Text, nullable=True)
-    objective = Column(Text, nullable=True)
-    assessment = Column(Text, nullable=True)
-    plan = Column(Text, nullable=True)
+    subjective = deferred(Column(Text, nullable=True), group="body")
+    objective = deferred(Column(Text, nullable=True), group="body")
+    assessment = deferred(Column(Text, nullable=True), group="body")
+    plan = deferred(Column(Text, nullable=True), group="body")
     
     created_at = Column(DateTime, default=datetime.utcnow)
+    
+    patient = relationship("Patient", back_populates="clinical_notes")
 
 class AuditLog(Base):
-    """HIPAA-compliant audit trail"""
+    """HIPAA-compliant audit trail
+
+    Append-only and range-partitioned by month on PostgreSQL; see
+    create_audit_log_partition.  The partition key has to be part of the
+    primary key, hence (id, timestamp).
+    """
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        Index("ix_audit_resource_time", "resource_type", "resource_id", "timestamp",
+              postgresql_include=["action", "user_id"]),
+        Index("brin_audit_ts", "timestamp", postgresql_using="brin",
+              postgresql_with={"pages_per_range": 32}),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
-    patient_id = Column(String, ForeignKey("patients.patient_id"))
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)  # Client-side: composite PKs get no autoincrement
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id"), index=True)
     
     user_id = Column(String)
     action = Column(String)  # CREATE, READ, UPDATE, DELETE
     resource_type = Column(String)  # Patient, LabResult, Medication, etc.
     resource_id = Column(String)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, primary_key=True, default=datetime.utcnow)
     ip_address = Column(String)
     user_agent = Column(String)
     
+# Rows outside every monthly partition land here rather than failing the insert
+event.listen(
+    AuditLog.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS %(table)s_default PARTITION OF %(table)s DEFAULT")
+    .execute_if(dialect="postgresql"),
+)
+
+def create_audit_log_partition(connection, month: date) -> str:
+    """Create the audit_logs partition covering the calendar month of ``month``
+
+    Meant to run ahead of time from a scheduled job (e.g. for next month);
+    purging old audit data is then a DROP TABLE of its partition.
+    """
+    start = month.replace(day=1)
+    end = (start + timedelta(days=32)).replace(day=1)
+    name = f"{AuditLog.__tablename__}_{start:%Y_%m}"
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {AuditLog.__tablename__} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+    return name
+
+# Narrative bodies are the largest TOASTed values; LZ4 (PostgreSQL 14+) beats pglz
+# on both ratio and decompression speed for clinical text
+_LZ4_COLUMNS = {
+    ClinicalNote: ("note_text", "subjective", "objective", "assessment", "plan"),
+    ImagingStudy: ("technique", "findings", "impression", "recommendations", "comparison"),
+    Procedure: ("procedure_details", "post_op_course", "pathology_report"),
+}
+
+def _supports_lz4(ddl, target, bind, **kw):
+    version = getattr(bind.dialect, "server_version_info", None)
+    return bind.dialect.name == "postgresql" and version is not None and version >= (14,)
+
+for _model, _columns in _LZ4_COLUMNS.items():
+    event.listen(
+        _model.__table__,
+        "after_create",
+        DDL("ALTER TABLE %(table)s " + ", ".join(
+            f"ALTER COLUMN {column} SET COMPRESSION lz4" for column in _columns
+        )).execute_if(callable_=_supports_lz4),
+    )
+
+# Denormalized chart summary maintenance
+ACTIVE_PROBLEM_STATUSES = ("Active", "Chronic")
+ACTIVE_MEDICATION_STATUSES = ("Active",)
+
+_VITALS_SUMMARY_FIELDS = (
+    "encounter_id", "temperature_f", "heart_rate", "blood_pressure_systolic",
+    "blood_pressure_diastolic", "respiratory_rate", "oxygen_saturation",
+    "weight_kg", "height_cm", "pain_score", "measurement_time",
+)
+
+def _encounter_patients(connection, encounter_ids) -> Dict[str, uuid.UUID]:
+    """Map encounter ids to the ids of the patients they belong to"""
+    encounters = ClinicalEncounter.__table__
+    return dict(connection.execute(
+        select(encounters.c.encounter_id, encounters.c.patient_id)
+        .where(encounters.c.encounter_id.in_(set(encounter_ids)))
+    ).all())
+
+def _vitals_summary(row) -> Dict[str, Any]:
+    """The last_vitals_json document for one VitalSigns row"""
+    summary = {field: row.get(field) for field in _VITALS_SUMMARY_FIELDS}
+    if summary["measurement_time"] is not None:
+        summary["measurement_time"] = summary["measurement_time"].isoformat()
+    return summary
+
+def store_last_vitals(connection, vitals_rows: List[Dict[str, Any]]) -> List[uuid.UUID]:
+    """Copy the latest of the given VitalSigns rows per patient into Patient.last_vitals_json
+
+    Compare-and-set: a patient's stored vitals are only replaced by a newer
+    measurement_time, so backfilling older rows leaves the summary alone.
+    Returns the ids of the patients whose summary may have changed.
+    """
+    if not vitals_rows:
+        return []
+    patients = Patient.__table__
+    encounter_patients = _encounter_patients(connection, (row.get("encounter_id") for row in vitals_rows))
+    latest = {}
+    for row in sorted(vitals_rows, key=lambda r: r.get("measurement_time") or datetime.min):
+        patient_id = encounter_patients.get(row.get("encounter_id"))
+        if patient_id is not None:
+            latest[patient_id] = row
+    if latest:
+        # isoformat() strings of naive datetimes sort chronologically
+        stored_time = patients.c.last_vitals_json["measurement_time"].as_string()
+        connection.execute(
+            update(patients)
+            .where(patients.c.id == bindparam("target_id"))
+            .where(stored_time.is_(None) | (stored_time < bindparam("measured_at", type_=String)))
+            .values(last_vitals_json=bindparam("summary", type_=JSON)),
+            [
+                {"target_id": patient_id, "summary": summary, "measured_at": summary["measurement_time"]}
+                for patient_id, summary in ((pid, _vitals_summary(row)) for pid, row in latest.items())
+            ],
+        )
+    return list(latest)
+
+def refresh_last_vitals(connection, patient_ids) -> None:
+    """Recompute Patient.last_vitals_json from the stored VitalSigns rows
+
+    Used when vitals are updated, deleted or move between patients, where the
+    compare-and-set in store_last_vitals cannot tell what the latest row is.
+    """
+    patient_ids = [pid for pid in set(patient_ids) if pid is not None]
+    if not patient_ids:
+        return
+    patients = Patient.__table__
+    encounters = ClinicalEncounter.__table__
+    vitals = VitalSigns.__table__
+    ranked = (
+        select(
+            encounters.c.patient_id,
+            *(vitals.c[field] for field in _VITALS_SUMMARY_FIELDS),
+            func.row_number().over(
+                partition_by=encounters.c.patient_id,
+                order_by=(vitals.c.measurement_time.desc(), vitals.c.id.desc()),
+            ).label("recency"),
+        )
+        .join(encounters, vitals.c.encounter_id == encounters.c.encounter_id)
+        .where(encounters.c.patient_id.in_(patient_ids))
+        .subquery()
+    )
+    latest = {
+        row["patient_id"]: _vitals_summary(row)
+        for row in connection.execute(select(ranked).where(ranked.c.recency == 1)).mappings()
+    }
+    connection.execute(
+        update(patients)
+        .where(patients.c.id == bindparam("target_id"))
+        .values(last_vitals_json=bindparam("summary", type_=JSON(none_as_null=True))),
+        [{"target_id": patient_id, "summary": latest.get(patient_id)} for patient_id in patient_ids],
+    )
+
+def refresh_patient_summaries(connection, patient_ids) -> None:
+    """Recompute the problem/medication counts and last encounter date for the given patients"""
+    patient_ids = [pid for pid in set(patient_ids) if pid is not None]
+    if not patient_ids:
+        return
+    patients = Patient.__table__
+    problems = ProblemList.__table__
+    medications = Medication.__table__
+    encounters = ClinicalEncounter.__table__
+    connection.execute(
+        update(patients)
+        .where(patients.c.id.in_(patient_ids))
+        .values(
+            active_problem_count=select(func.count())
+            .select_from(problems)
+            .where(problems.c.patient_id == patients.c.id,
+                   problems.c.status.in_(ACTIVE_PROBLEM_STATUSES))
+            .scalar_subquery(),
+            active_med_count=select(func.count())
+            .select_from(medications)
+            .where(medications.c.patient_id == patients.c.id,
+                   medications.c.status.in_(ACTIVE_MEDICATION_STATUSES))
+            .scalar_subquery(),
+            last_encounter_date=select(func.max(encounters.c.date))
+            .where(encounters.c.patient_id == patients.c.id)
+            .scalar_subquery(),
+        )
+    )
+
+def _values_before_and_after(obj, attribute: str) -> set:
+    """An attribute's current value plus any value it held before this flush"""
+    return {getattr(obj, attribute), *inspect(obj).attrs[attribute].history.deleted}
+
+def _maintain_patient_summaries(session, flush_context):
+    """Keep the Patient chart summary columns in step with the rows just flushed
+
+    Runs once per flush rather than per row, so a chart written in one flush costs
+    a single UPDATE per patient.  Rows moved to another patient refresh both the
+    old and the new one.  Registered on RoutingSession only, so sessions that
+    never touch the EHR models don't pay for the scan.  Core-level bulk inserts
+    bypass this hook and should call refresh_patient_summaries themselves.
+    """
+    touched = set()
+    new_vitals = []
+    # Updated, deleted or moved vitals need the latest row recomputed, which
+    # store_last_vitals' compare-and-set cannot do
+    vitals_patients = set()
+    vitals_encounters = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (ProblemList, Medication, ClinicalEncounter)):
+            patient_ids = _values_before_and_after(obj, "patient_id")
+            touched.update(patient_ids)
+            if isinstance(obj, ClinicalEncounter) and (obj in session.deleted or len(patient_ids) > 1):
+                vitals_patients.update(patient_ids)
+        elif isinstance(obj, VitalSigns):
+            if obj in session.new:
+                new_vitals.append(obj)
+            else:
+                vitals_encounters.update(_values_before_and_after(obj, "encounter_id"))
+    if not touched and not new_vitals and not vitals_encounters:
+        return
+    connection = session.connection()
+    refresh_patient_summaries(connection, touched)
+    touched.update(store_last_vitals(connection, [
+        {field: getattr(vitals, field) for field in _VITALS_SUMMARY_FIELDS} for vitals in new_vitals
+    ]))
+    if vitals_encounters:
+        vitals_patients.update(_encounter_patients(connection, vitals_encounters).values())
+    refresh_last_vitals(connection, vitals_patients)
+    touched.update(vitals_patients)
+    session.info.setdefault("_stale_patient_summaries", set()).update(touched)
+
+_PATIENT_SUMMARY_ATTRS = ["active_problem_count", "active_med_count", "last_encounter_date", "last_vitals_json"]
+
+def _expire_patient_summaries(session, flush_context):
+    """Expire summary columns rewritten behind the ORM's back on loaded Patients
+
+    Needed because sessions may keep objects across commits (expire_on_commit=False).
+    """
+    for patient_id in session.info.pop("_stale_patient_summaries", ()):
+        patient = session.identity_map.get(identity_key(Patient, patient_id))
+        if patient is not None:
+            session.expire(patient, _PATIENT_SUMMARY_ATTRS)
+
+# Bulk cohort loading
+_SUMMARY_SOURCE_MODELS = (ProblemList, Medication, ClinicalEncounter)
+
+def bulk_create_patients(session, patients: List[Dict[str, Any]]) -> List[uuid.UUID]:
+    """Insert Patient rows in batched round-trips and return their ids in input order"""
+    if not patients:
+        return []
+    rows = [{**patient, **_address_columns(patient.get("address"))} for patient in patients]
+    return list(session.scalars(
+        insert(Patient).returning(Patient.id, sort_by_parameter_order=True), rows
+    ))
+
+_UPSERT_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+def _dedup_key(model) -> List[Column]:
+    """Columns of the model's natural-key unique constraint"""
+    for constraint in model.__table__.constraints:
+        if isinstance(constraint, UniqueConstraint):
+            return list(constraint.columns)
+    raise ValueError(f"{model.__name__} has no unique constraint to deduplicate on")
+
+def _fill_key_defaults(key: List[Column], rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Replace missing/None natural-key values with the column's sentinel default ("")"""
+    defaults = {
+        column.name: column.default.arg for column in key
+        if column.default is not None and column.default.is_scalar
+    }
+    if not defaults:
+        return rows
+    return [
+        {**row, **{name: value for name, value in defaults.items() if row.get(name) is None}}
+        for row in rows
+    ]
+
+def bulk_create_chart_rows(session, model, rows: List[Dict[str, Any]], skip_duplicates: bool = False) -> None:
+    """Insert rows of one chart table in batched round-trips
+
+    With skip_duplicates, rows that collide with the table's unique constraint
+    (e.g. a re-run re-inserting the same immunization dose) are dropped by the
+    database via ON CONFLICT DO NOTHING instead of a check-then-insert.
+
+    Bulk inserts skip the flush hook, so the Patient chart summary is refreshed
+    here for the tables that feed it.
+    """
+    if not rows:
+        return
+    if skip_duplicates:
+        dialect_name = session.get_bind().dialect.name
+        if dialect_name not in _UPSERT_INSERTS:
+            raise ValueError(f"skip_duplicates needs ON CONFLICT support; not available on {dialect_name}")
+        key = _dedup_key(model)
+        rows = _fill_key_defaults(key, rows)
+        statement = _UPSERT_INSERTS[dialect_name](model).on_conflict_do_nothing(
+            index_elements=[column.name for column in key]
+        )
+    else:
+        statement = insert(model)
+    session.execute(statement, rows)
+    if model in _SUMMARY_SOURCE_MODELS:
+        refresh_patient_summaries(session.connection(), (row.get("patient_id") for row in rows))
+    elif model is VitalSigns:
+        store_last_vitals(session.connection(), rows)
+
+def bulk_create_lab_panels(session, panels: List[Dict[str, Any]]) -> List[int]:
+    """Insert LabPanel rows plus their nested "results" lists and return the panel ids"""
+    if not panels:
+        return []
+    panel_rows = [{k: v for k, v in panel.items() if k != "results"} for panel in panels]
+    panel_ids = list(session.scalars(
+        insert(LabPanel).returning(LabPanel.id, sort_by_parameter_order=True), panel_rows
+    ))
+    results = [
+        {**result, "panel_id": panel_id}
+        for panel, panel_id in zip(panels, panel_ids)
+        for result in panel.get("results", ())
+    ]
+    bulk_create_chart_rows(session, LabResult, results)
+    return panel_ids
+
+# Per-cohort aggregates, materialized on PostgreSQL so cohort validation reads one
+# row instead of scanning the cohort.  Built from the denormalized Patient summary
+# columns, so no joins.  Mapped on its own MetaData: create_all must not try to
+# create it as a table.
+_COHORT_STATS_SQL = """
+CREATE MATERIALIZED VIEW IF NOT EXISTS cohort_stats AS
+SELECT synthetic_cohort_id,
+       COUNT(*) AS patient_count,
+       AVG(age) AS mean_age,
+       percentile_cont(0.5) WITHIN GROUP (ORDER BY age) AS median_age,
+       AVG(bmi) AS mean_bmi,
+       COUNT(DISTINCT sex) AS distinct_sexes,
+       COUNT(DISTINCT state) AS distinct_states,
+       AVG(active_problem_count) AS mean_active_problems,
+       AVG(active_med_count) AS mean_active_meds
+FROM patients
+WHERE synthetic_cohort_id IS NOT NULL
+GROUP BY synthetic_cohort_id
+"""
+
+event.listen(Patient.__table__, "after_create", DDL(_COHORT_STATS_SQL).execute_if(dialect="postgresql"))
+# REFRESH ... CONCURRENTLY needs a unique index on the view
+event.listen(
+    Patient.__table__,
+    "after_create",
+    DDL("CREATE UNIQUE INDEX IF NOT EXISTS ix_cohort_stats_cohort ON cohort_stats (synthetic_cohort_id)")
+    .execute_if(dialect="postgresql"),
+)
+event.listen(
+    Patient.__table__,
+    "before_drop",
+    DDL("DROP MATERIALIZED VIEW IF EXISTS cohort_stats").execute_if(dialect="postgresql"),
+)
+
+cohort_stats = Table(
+    "cohort_stats",
+    MetaData(),
+    Column("synthetic_cohort_id", String, primary_key=True),
+    Column("patient_count", Integer),
+    Column("mean_age", Float),
+    Column("median_age", Float),
+    Column("mean_bmi", Float),
+    Column("distinct_sexes", Integer),
+    Column("distinct_states", Integer),
+    Column("mean_active_problems", Float),
+    Column("mean_active_meds", Float),
+)
+
+def refresh_cohort_stats(connection) -> None:
+    """Recompute cohort_stats after a cohort has been loaded (PostgreSQL only)
+
+    Nothing refreshes the view automatically: the caller that writes a cohort
+    (e.g. after bulk_create_patients) must call this once the load commits.
+    CONCURRENTLY keeps the view readable by running validations meanwhile.
+    """
+    connection.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY cohort_stats"))
+
+def get_cohort_stats(session, cohort_id: str) -> Optional[Dict[str, Any]]:
+    """Precomputed aggregates for one synthetic cohort
+
+    Returns None until refresh_cohort_stats has run after the cohort was
+    loaded, and always on databases other than PostgreSQL, where the view
+    does not exist.
+    """
+    if session.get_bind().dialect.name != "postgresql":
+        return None
+    row = session.execute(
+        select(cohort_stats).where(cohort_stats.c.synthetic_cohort_id == cohort_id)
+    ).mappings().first()
+    return dict(row) if row is not None else None
+
+# Guarded chart loading
+def safe_patient_query(session):
+    """Query Patients with the full chart prefetched and every other lazy load raising
+
+    Any relationship not prefetched here raises InvalidRequestError instead of
+    silently issuing one SELECT per row, so list endpoints cannot regress into
+    N+1 loading during serialization.  Many-to-one lookups already satisfied by
+    the identity map (e.g. problem.patient) still resolve.
+    """
+    return session.query(Patient).options(
+        selectinload(Patient.problems),
+        selectinload(Patient.allergies),
+        selectinload(Patient.lab_panels).selectinload(LabPanel.results),
+        selectinload(Patient.medications),
+        selectinload(Patient.imaging_studies),
+        selectinload(Patient.encounters).selectinload(ClinicalEncounter.vital_signs),
+        selectinload(Patient.procedures),
+        selectinload(Patient.immunizations),
+        selectinload(Patient.family_history),
+        selectinload(Patient.care_team_members),
+        selectinload(Patient.clinical_notes),
+        raiseload("*", sql_only=True),
+    )
+
 # Database initialization and utilities
 def get_database_url():
     """Get database URL from environment or use default"""
     return os.getenv('DATABASE_URL', 'postgresql://localhost:5432/synthetic_ehr')
 
-def create_database_engine():
-    """Create SQLAlchemy engine with proper configuration"""
-    database_url = get_database_url()
-    engine = create_engine(
-        database_url,
+def _build_engine(database_url):
+    """Create an engine with the pool and batching settings used for every EHR database"""
+    url = make_url(database_url)
+    connect_args = {}
+    if url.drivername == "postgresql+psycopg":
+        # psycopg 3 (opt in with a postgresql+psycopg:// URL) pipelines executemany
+        # batches itself; also let it server-prepare the repeated cohort INSERTs
+        connect_args["prepare_threshold"] = 5
+    return create_engine(
+        url,
         echo=False,  # Set to True for SQL debugging
         pool_size=10,
         max_overflow=20,
-        pool_pre_ping=True
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        insertmanyvalues_page_size=10000,  # rows per batched INSERT in the bulk helpers
+        connect_args=connect_args
     )
-    return engine
+
+@lru_cache(maxsize=1)
+def _engine():
+    """Process-wide primary engine; every caller shares its connection pool"""
+    return _build_engine(get_database_url())
+
+@lru_cache(maxsize=1)
+def _read_engine():
+    """Engine for analytics reads: READ_REPLICA_URL if configured, else the primary"""
+    replica_url = os.getenv('READ_REPLICA_URL')
+    return _build_engine(replica_url) if replica_url else _engine()
+
+def create_database_engine():
+    """Return the shared SQLAlchemy engine"""
+    return _engine()
+
+class RoutingSession(Session):
+    """Session that sends a read-only session's SELECTs to the read replica
+
+    Sessions opened with info={"read_only": True} run SELECT statements on
+    _read_engine().  Everything else -- flushes, Core insert/update/delete,
+    text() statements and bare session.connection() calls -- goes to the
+    primary, so nothing is ever written to a replica.  An explicit bind
+    replaces the primary engine.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get("read_only") and not self._flushing and getattr(clause, "is_select", False):
+            return _read_engine()
+        return self.bind if self.bind is not None else _engine()
+
+event.listen(RoutingSession, "after_flush", _maintain_patient_summaries)
+event.listen(RoutingSession, "after_flush_postexec", _expire_patient_summaries)
+
+# Engines are created on first use so importing the models never loads a DB driver
+_session_factory = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, expire_on_commit=False)
+
+# Thread-local sessions for request handlers; call SessionLocal.remove() at request teardown
+SessionLocal = scoped_session(_session_factory)
 
 def create_all_tables():
     """Create all database tables"""
-    engine = create_database_engine()
+    engine = _engine()
     Base.metadata.create_all(bind=engine)
     return engine
 
 def get_db_session():
-    """Get database session"""
-    engine = create_database_engine()
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    """Get the current thread's database session"""
     return SessionLocal()
 
+def get_read_session():
+    """Open a new session for cohort analytics that reads from the replica"""
+    return _session_factory(info={"read_only": True})
+
 # Export all models for import
 __all__ = [
     'Patient', 'ProblemList', 'Allergy', 'LabPanel', 'LabResult', 'Medication',
     'ImagingStudy', 'ClinicalEncounter', 'VitalSigns', 'Procedure', 'Immunization',
     'FamilyHistory', 'AdvanceDirective', 'CareTeamMember', 'ClinicalNote', 'AuditLog',
-    'Base', 'create_all_tables', 'get_db_session'
+    'Base', 'SessionLocal', 'create_database_engine', 'create_all_tables', 'get_db_session', 'get_read_session',
+    'RoutingSession', 'refresh_patient_summaries',
+    'store_last_vitals', 'refresh_last_vitals', 'bulk_create_patients', 'bulk_create_chart_rows', 'bulk_create_lab_panels',
+    'safe_patient_query', 'create_audit_log_partition', 'cohort_stats', 'refresh_cohort_stats',
+    'get_cohort_stats'
 ]
\ No newline at end of file
@@ -3,99 +3,20 @@ Multi-layered database models for synthetic EHR system
 Supports SQL (PostgreSQL), Document storage, and audit trails
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, Boolean, JSON, ForeignKey
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, JSON, ForeignKey
 from sqlalchemy.orm import sessionmaker, relationship
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from datetime import datetime
 import uuid
 import os
 
-Base = declarative_base()
+from .base import Base
 
-# Core EHR Tables (SQL Database)
-class Patient(Base):
-    __tablename__ = 'patients'
-    
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    patient_id = Column(String, unique=True, nullable=False)
-    age = Column(Integer)
-    gender = Column(String(50))
-    ethnicity = Column(String(100))
-    synthetic_cohort_id = Column(String, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    
-    # Relationships
-    encounters = relationship("Encounter", back_populates="patient")
-    lab_results = relationship("LabResult", back_populates="patient")
-    medications = relationship("Medication", back_populates="patient")
-    conditions = relationship("Condition", back_populates="patient")
-    clinical_notes = relationship("ClinicalNote", back_populates="patient")
-
-class Encounter(Base):
-    __tablename__ = 'encounters'
-    
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    patient_id = Column(UUID(as_uuid=True), ForeignKey('patients.id'))
-    encounter_date = Column(DateTime)
-    encounter_type = Column(String(100))  # outpatient, inpatient, emergency
-    chief_complaint = Column(Text)
-    diagnosis_codes = Column(ARRAY(String))  # ICD-10 codes
-    
-    patient = relationship("Patient", back_populates="encounters")
-
-class LabResult(Base):
-    __tablename__ = 'lab_results'
-    
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    patient_id = Column(UUID(as_uuid=True), ForeignKey('patients.id'))
-    test_name = Column(String(200))
-    value = Column(Float)
-    unit = Column(String(50))
-    reference_range = Column(String(100))
-    abnormal_flag = Column(String(10))
-    collection_date = Column(DateTime)
-    
-    patient = relationship("Patient", back_populates="lab_results")
-
-class Medication(Base):
-    __tablename__ = 'medications'
-    
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    patient_id = Column(UUID(as_uuid=True), ForeignKey('patients.id'))
-    medication_name = Column(String(200))
-    dosage = Column(String(100))
-    frequency = Column(String(100))
-    start_date = Column(DateTime)
-    end_date = Column(DateTime)
-    indication = Column(String(200))
-    
-    patient = relationship("Patient", back_populates="medications")
-
-class Condition(Base):
-    __tablename__ = 'conditions'
-    
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    patient_id = Column(UUID(as_uuid=True), ForeignKey('patients.id'))
-    condition_name = Column(String(200))
-    icd10_code = Column(String(20))
-    onset_date = Column(DateTime)
-    status = Column(String(50))  # active, resolved, chronic
-    severity = Column(String(50))
-    
-    patient = relationship("Patient", back_populates="conditions")
-
-class ClinicalNote(Base):
-    __tablename__ = 'clinical_notes'
-    
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    patient_id = Column(UUID(as_uuid=True), ForeignKey('patients.id'))
-    note_type = Column(String(100))  # progress, discharge, consult
-    note_text = Column(Text)
-    author = Column(String(100))
-    created_date = Column(DateTime)
-    
-    patient = relationship("Patient", back_populates="clinical_notes")
+# Core EHR tables (Patient, LabResult, Medication, ClinicalNote, AuditLog and
+# the rest of the clinical record) are defined once, in comprehensive_ehr_models
+from .comprehensive_ehr_models import (
+    Patient, LabResult, Medication, ClinicalNote, AuditLog, RoutingSession, create_database_engine
+)
 
 # Audit and Agent Tracking Tables
 class AgentExecution(Base):
@@ -113,10 +34,11 @@ class AgentExecution(Base):
     error_message = Column(Text)
     
     # Relationships
-    audit_logs = relationship("AuditLog", back_populates="agent_execution")
+    execution_logs = relationship("AgentExecutionLog", back_populates="agent_execution")
 
-class AuditLog(Base):
-    __tablename__ = 'audit_logs'
+# Log lines emitted by an agent execution (the HIPAA access trail is AuditLog)
+class AgentExecutionLog(Base):
+    __tablename__ = 'agent_execution_logs'
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     execution_id = Column(UUID(as_uuid=True), ForeignKey('agent_executions.id'))
@@ -125,7 +47,7 @@ class AuditLog(Base):
     message = Column(Text)
     meta_data = Column(JSON)
     
-    agent_execution = relationship("AgentExecution", back_populates="audit_logs")
+    agent_execution = relationship("AgentExecution", back_populates="execution_logs")
 
 class WorkflowState(Base):
     __tablename__ = 'workflow_states'
@@ -137,6 +59,9 @@ class WorkflowState(Base):
     status = Column(String(50))
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow)
+    version_id = Column(Integer, nullable=False, default=1)  # Optimistic lock counter
+
+    __mapper_args__ = {"version_id_col": version_id}
 
 # Research and Knowledge Base Tables
 class LiteraturePaper(Base):
@@ -188,8 +113,8 @@ class DatabaseManager:
         if not self.database_url:
             raise ValueError("DATABASE_URL environment variable not set")
         
-        self.engine = create_engine(self.database_url)
-        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.engine = create_database_engine()
+        self.SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=self.engine)
     
     def create_tables(self):
         """Create all tables in the database"""
@@ -220,5 +145,12 @@ class DatabaseSession:
             self.session.commit()
         self.session.close()
 
-# Initialize database manager (singleton pattern)
-db_manager = DatabaseManager()
\ No newline at end of file
+# Database manager singleton, created on first use
+_db_manager = None
+
+def get_db_manager() -> DatabaseManager:
+    """Get or create the global database manager instance"""
+    global _db_manager
+    if _db_manager is None:
+        _db_manager = DatabaseManager()
+    return _db_manager
\ No newline at end of file
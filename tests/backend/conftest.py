@@ -0,0 +1,9 @@
+"""
+Shared pytest setup for the backend tests
+Makes the repository root importable so tests can load the server and model modules directly
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
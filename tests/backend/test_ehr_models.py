@@ -0,0 +1,236 @@
+"""
+Tests for the comprehensive EHR models against an in-memory SQLite database
+Cover the hooks and helpers that keep the denormalized and bulk-loaded data consistent
+"""
+
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+
+import models.comprehensive_ehr_models as ehr
+
+EHR_TABLES = [
+    getattr(ehr, name).__table__ for name in ehr.__all__
+    if hasattr(getattr(ehr, name), "__table__")
+]
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    ehr.Base.metadata.create_all(engine, tables=EHR_TABLES)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session(engine):
+    with ehr.RoutingSession(bind=engine) as session:
+        yield session
+
+
+class TestAuditLog:
+    """Audit trail writes on the partitioned (id, timestamp) key"""
+
+    def test_audit_rows_insert_without_database_autoincrement(self, session):
+        session.add_all([ehr.AuditLog(user_id="u", action="READ") for _ in range(3)])
+        session.commit()
+        ids = session.scalars(select(ehr.AuditLog.id)).all()
+        assert len(set(ids)) == 3
+
+
+class TestPatientSummary:
+    """Denormalized chart summary columns maintained on flush"""
+
+    def test_summary_tracks_inserts_updates_and_deletes(self, session):
+        patient = ehr.Patient(patient_id="P1")
+        patient.problems = [ehr.ProblemList(status=status) for status in ("Active", "Chronic", "Resolved")]
+        patient.medications = [ehr.Medication(rxnorm_code=code, start_date=date(2024, 1, 1), status=status)
+                               for code, status in (("1", "Active"), ("2", "Held"))]
+        patient.encounters = [
+            ehr.ClinicalEncounter(encounter_id=f"E{month}", date=date(2024, month, 1),
+                                  vital_signs=[ehr.VitalSigns(heart_rate=60 + month,
+                                                              measurement_time=datetime(2024, month, 1, 9))])
+            for month in (1, 3, 2)
+        ]
+        session.add(patient)
+        session.commit()
+        assert patient.active_problem_count == 2
+        assert patient.active_med_count == 1
+        assert patient.last_encounter_date == date(2024, 3, 1)
+        assert patient.last_vitals_json["heart_rate"] == 63
+        assert patient.last_vitals_json["measurement_time"] == "2024-03-01T09:00:00"
+
+        session.delete(patient.problems[0])
+        patient.medications[1].status = "Active"
+        session.commit()
+        assert patient.active_problem_count == 1
+        assert patient.active_med_count == 2
+
+    def test_backfilled_vitals_do_not_replace_newer_ones(self, session):
+        encounter = ehr.ClinicalEncounter(encounter_id="E1", date=date(2024, 3, 1))
+        patient = ehr.Patient(patient_id="P1", encounters=[encounter])
+        encounter.vital_signs = [ehr.VitalSigns(heart_rate=70, measurement_time=datetime(2024, 3, 1, 9))]
+        session.add(patient)
+        session.commit()
+
+        encounter.vital_signs.append(ehr.VitalSigns(heart_rate=50, measurement_time=datetime(2024, 1, 1, 9)))
+        session.commit()
+        assert patient.last_vitals_json["heart_rate"] == 70
+
+        ehr.bulk_create_chart_rows(session, ehr.VitalSigns, [
+            {"encounter_id": "E1", "heart_rate": 40, "measurement_time": datetime(2023, 1, 1, 9)},
+        ])
+        session.commit()
+        session.expire(patient)
+        assert patient.last_vitals_json["heart_rate"] == 70
+
+    def test_vitals_updates_and_deletes_recompute_latest(self, session):
+        encounter = ehr.ClinicalEncounter(encounter_id="E1", date=date(2024, 3, 1))
+        patient = ehr.Patient(patient_id="P1", encounters=[encounter])
+        older, newer = (ehr.VitalSigns(heart_rate=rate, measurement_time=datetime(2024, month, 1, 9))
+                        for rate, month in ((60, 1), (70, 2)))
+        encounter.vital_signs = [older, newer]
+        session.add(patient)
+        session.commit()
+        assert patient.last_vitals_json["heart_rate"] == 70
+
+        newer.heart_rate = 75
+        session.commit()
+        assert patient.last_vitals_json["heart_rate"] == 75
+
+        session.delete(newer)
+        session.commit()
+        assert patient.last_vitals_json["heart_rate"] == 60
+
+        session.delete(older)
+        session.commit()
+        assert patient.last_vitals_json is None
+
+    def test_rows_moved_between_patients_refresh_both(self, session):
+        first = ehr.Patient(patient_id="P1", problems=[ehr.ProblemList(status="Active")])
+        second = ehr.Patient(patient_id="P2")
+        encounter = ehr.ClinicalEncounter(encounter_id="E1", date=date(2024, 3, 1), vital_signs=[
+            ehr.VitalSigns(heart_rate=70, measurement_time=datetime(2024, 3, 1, 9)),
+        ])
+        first.encounters = [encounter]
+        session.add_all([first, second])
+        session.commit()
+
+        first.problems[0].patient_id = second.id
+        encounter.patient_id = second.id
+        session.commit()
+        assert (first.active_problem_count, second.active_problem_count) == (0, 1)
+        assert (first.last_encounter_date, second.last_encounter_date) == (None, date(2024, 3, 1))
+        assert first.last_vitals_json is None
+        assert second.last_vitals_json["heart_rate"] == 70
+
+    def test_plain_sessions_do_not_maintain_summary(self, engine):
+        with Session(engine) as session:
+            patient = ehr.Patient(patient_id="P1", problems=[ehr.ProblemList(status="Active")])
+            session.add(patient)
+            session.commit()
+            assert patient.active_problem_count == 0
+
+
+class TestBulkLoading:
+    """Batched Core inserts and ON CONFLICT deduplication"""
+
+    def test_bulk_patients_and_children(self, session):
+        ids = ehr.bulk_create_patients(session, [
+            {"patient_id": f"P{i}", "address": {"state": "CA", "zip": f"9411{i}"}} for i in range(3)
+        ])
+        ehr.bulk_create_chart_rows(session, ehr.ProblemList, [
+            {"patient_id": patient_id, "status": "Active"} for patient_id in ids for _ in range(2)
+        ])
+        panel_ids = ehr.bulk_create_lab_panels(session, [
+            {"patient_id": ids[0], "panel_name": "CBC", "results": [{"test_name": "hb"}, {"test_name": "wbc"}]},
+            {"patient_id": ids[1], "panel_name": "BMP", "results": [{"test_name": "na"}]},
+        ])
+        session.commit()
+
+        patients = {patient.id: patient for patient in session.scalars(select(ehr.Patient))}
+        assert [patients[patient_id].patient_id for patient_id in ids] == ["P0", "P1", "P2"]
+        assert patients[ids[2]].zip == "94112"
+        assert all(patient.active_problem_count == 2 for patient in patients.values())
+        results = session.execute(select(ehr.LabResult.panel_id, ehr.LabResult.test_name)).all()
+        assert sorted(results) == sorted([(panel_ids[0], "hb"), (panel_ids[0], "wbc"), (panel_ids[1], "na")])
+
+    def test_skip_duplicates_dedups_rows_with_unknown_key_values(self, session):
+        [patient_id] = ehr.bulk_create_patients(session, [{"patient_id": "P1"}])
+        dose = {"patient_id": patient_id, "vaccine_name": "Flu", "date_administered": date(2024, 1, 1), "lot_number": None}
+        order = {"patient_id": patient_id, "start_date": date(2024, 1, 1), "status": "Active"}
+        for _ in range(2):
+            ehr.bulk_create_chart_rows(session, ehr.Immunization, [dose], skip_duplicates=True)
+            ehr.bulk_create_chart_rows(session, ehr.Medication, [order], skip_duplicates=True)
+        session.commit()
+
+        assert session.scalar(select(func.count()).select_from(ehr.Immunization)) == 1
+        assert session.scalar(select(func.count()).select_from(ehr.Medication)) == 1
+        assert session.get(ehr.Patient, patient_id).active_med_count == 1
+
+    def test_skip_duplicates_requires_a_unique_constraint(self, session):
+        with pytest.raises(ValueError):
+            ehr.bulk_create_chart_rows(session, ehr.Allergy, [{"allergen": "x"}], skip_duplicates=True)
+
+
+class TestCohortStats:
+    """The cohort_stats materialized view only exists on PostgreSQL"""
+
+    def test_cohort_stats_unavailable_off_postgresql(self, session):
+        ehr.bulk_create_patients(session, [{"patient_id": "P1", "synthetic_cohort_id": "c1"}])
+        session.commit()
+
+        assert ehr.get_cohort_stats(session, "c1") is None
+
+
+@pytest.fixture
+def routed_engines(tmp_path, monkeypatch):
+    """Point the shared primary and replica engines at two separate SQLite files"""
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'primary.db'}")
+    monkeypatch.setenv("READ_REPLICA_URL", f"sqlite:///{tmp_path / 'replica.db'}")
+    ehr._engine.cache_clear()
+    ehr._read_engine.cache_clear()
+    primary, replica = ehr._engine(), ehr._read_engine()
+    for engine in (primary, replica):
+        ehr.Base.metadata.create_all(engine, tables=EHR_TABLES)
+    yield primary, replica
+    ehr.SessionLocal.remove()
+    for engine in (primary, replica):
+        engine.dispose()
+    ehr._engine.cache_clear()
+    ehr._read_engine.cache_clear()
+
+
+def _patient_ids(engine):
+    with engine.connect() as connection:
+        return set(connection.scalars(select(ehr.Patient.patient_id)))
+
+
+class TestRoutingSession:
+    """Read-only sessions read from the replica and never write to it"""
+
+    def test_read_only_selects_use_replica(self, routed_engines):
+        primary, replica = routed_engines
+        with Session(primary) as session:
+            session.add(ehr.Patient(patient_id="P1"))
+            session.commit()
+
+        with ehr.get_read_session() as session:
+            assert session.scalar(select(func.count()).select_from(ehr.Patient)) == 0
+        with ehr.get_db_session() as session:
+            assert session.scalar(select(func.count()).select_from(ehr.Patient)) == 1
+
+    def test_read_only_writes_go_to_primary(self, routed_engines):
+        primary, replica = routed_engines
+        with ehr.get_read_session() as session:
+            session.add(ehr.Patient(patient_id="ORM"))
+            session.flush()
+            session.execute(insert(ehr.Patient), [{"patient_id": "CORE"}])
+            session.connection().execute(insert(ehr.Patient), [{"patient_id": "CONNECTION"}])
+            session.commit()
+
+        assert _patient_ids(primary) == {"ORM", "CORE", "CONNECTION"}
+        assert _patient_ids(replica) == set()
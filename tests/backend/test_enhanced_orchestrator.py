@@ -0,0 +1,81 @@
+"""
+Tests for phase scheduling in the V3 enhanced orchestrator
+Phases are swapped for recording stub agents so no real agents run
+"""
+
+import asyncio
+import uuid
+
+from agents.integrated.enhanced_base_agent import AgentRole
+from agents.integrated.enhanced_orchestrator import EnhancedAgentOrchestrator
+
+
+class RecordingAgent:
+    """Stub agent that records how many patients it saw, then yields to other tasks"""
+
+    role = AgentRole.DOER
+
+    def __init__(self, name, output, seen):
+        self.name = name
+        self.output = output
+        self.seen = seen
+
+    async def execute_with_full_pipeline(self, pipeline_data, concurrency_controller=None, performance_monitor=None):
+        self.seen[self.name] = len(pipeline_data.get("synthetic_patients", []))
+        await asyncio.sleep(0)
+        return {
+            "output": self.output,
+            "metadata": {
+                "agent_name": self.name,
+                "agent_role": self.role.value,
+                "status": "success",
+                "execution_time_seconds": 0.0,
+                "timestamp": "2024-01-01T00:00:00",
+            },
+        }
+
+
+def _run_pipeline(seen):
+    orchestrator = EnhancedAgentOrchestrator()
+    outputs = {
+        "cohort_generation_phase": {"patients": [{"id": 1}, {"id": 2}]},
+        "qa_validation_phase": {"patients": [{"id": "qa"}], "validation": {"score": 1}},
+        "explanation_provenance_phase": {},
+        "supervision_phase": {"patients": [{"id": "supervision"}], "validation": {"score": 2}},
+    }
+    phase_agents = {
+        phase: {
+            f"{phase}-{i}": RecordingAgent(f"{phase}-{i}", outputs.get(phase, {}), seen)
+            for i in range(2)
+        }
+        for phase in orchestrator.execution_phases
+    }
+    orchestrator._get_phase_agents = phase_agents.__getitem__
+    return asyncio.run(orchestrator.execute_comprehensive_pipeline(uuid.uuid4(), {}))
+
+
+class TestConcurrentReviewPhases:
+    """The review phases run together but merge as if run in pipeline order"""
+
+    def test_review_phases_see_only_the_generated_cohort(self):
+        seen = {}
+        _run_pipeline(seen)
+        assert seen["qa_validation_phase-1"] == 5
+        assert seen["supervision_phase-0"] == 4
+        assert seen["supervision_phase-1"] == 5
+
+    def test_outputs_merge_in_pipeline_order(self):
+        result = _run_pipeline({})
+        assert result["overall_status"] == "completed"
+        assert [run["agent_name"] for run in result["agent_runs"]] == [
+            f"{phase}-{i}" for phase in (
+                "research_phase", "cohort_generation_phase", "data_robustness_phase",
+                "qa_validation_phase", "explanation_provenance_phase", "supervision_phase",
+            ) for i in range(2)
+        ]
+        assert [patient["id"] for patient in result["synthetic_patients"][4:]] == ["qa", "qa", "supervision", "supervision"]
+        assert result["validation_results"] == {"score": 2}
+        assert list(result["phase_results"]) == [
+            "research_phase", "cohort_generation_phase", "data_robustness_phase",
+            "qa_validation_phase", "explanation_provenance_phase", "supervision_phase",
+        ]
@@ -0,0 +1,190 @@
+"""
+Tests for the SQLite job stores behind the V2 and V3 servers
+Exercise the managers directly against a throwaway database file
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import integrated_server_v2 as v2
+
+
+AGENT_RUNS = [
+    {"agent_name": "cohort", "agent_type": "generation", "status": "success", "execution_time_ms": 10},
+    {"agent_name": "validator", "agent_type": "validation", "status": "success", "execution_time_ms": 30},
+    {"agent_name": "validator", "agent_type": "validation", "status": "failed", "execution_time_ms": 5},
+]
+
+
+@pytest.fixture
+def v2_manager(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = v2.SimpleJobManager()
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def v3_manager(tmp_path, monkeypatch):
+    # The V3 module opens its own job database in the working directory on import
+    monkeypatch.chdir(tmp_path)
+    import integrated_server_v3_enhanced as v3
+    manager = v3.EnhancedJobManager()
+    yield manager
+    manager.close()
+
+
+class TestSimpleJobManager:
+    """V2 job manager: claiming, finalizing and the trigger-maintained rollups"""
+
+    def test_start_job_claims_pending_job_once(self, v2_manager):
+        v2_manager.create_job("job-1", {"population_size": 5})
+        assert v2_manager.start_job("job-1") is True
+        assert v2_manager.start_job("job-1") is False
+        assert v2_manager.start_job("missing") is False
+        assert v2_manager.get_job_meta("job-1")["status"] == "running"
+
+    def test_finalize_job_writes_runs_and_status_together(self, v2_manager):
+        v2_manager.create_job("job-1", {})
+        v2_manager.start_job("job-1")
+        v2_manager.finalize_job("job-1", "completed", {"patients": 5}, AGENT_RUNS)
+
+        job = v2_manager.get_job("job-1")
+        assert job["status"] == "completed"
+        assert job["ended_at"] is not None
+        assert job["result_summary"] == {"patients": 5}
+        assert len(v2_manager.get_agent_runs("job-1")) == 3
+
+    def test_finalize_job_accepts_runs_without_execution_time(self, v2_manager):
+        v2_manager.create_job("job-1", {})
+        v2_manager.finalize_job("job-1", "completed", None, [{"agent_name": "cohort", "execution_time_ms": None}])
+
+        assert v2_manager.get_job("job-1")["status"] == "completed"
+        assert v2_manager.get_agent_runs("job-1")[0]["execution_time_ms"] == 0
+
+    def test_rollups_follow_job_and_agent_writes(self, v2_manager):
+        for job_id in ("job-1", "job-2"):
+            v2_manager.create_job(job_id, {})
+        v2_manager.start_job("job-1")
+        v2_manager.finalize_job("job-1", "completed", None, AGENT_RUNS)
+
+        job_stats, agent_type_count = v2_manager.get_platform_overview()
+        assert job_stats == {"completed": 1, "pending": 1}
+        assert agent_type_count == 2
+
+        performance = {(row[0], row[1]): row[2:] for row in v2_manager.iter_agent_performance()}
+        assert performance[("validation", "validator")] == (2, 1, 17.5)
+        assert performance[("generation", "cohort")] == (1, 1, 10.0)
+
+    def test_agent_run_pages_start_from_most_recent(self, v2_manager):
+        v2_manager.create_job("job-1", {})
+        runs = [
+            {"agent_name": f"agent-{i}", "status": "success", "ran_at": f"2024-01-01T00:00:{i:02d}"}
+            for i in range(5)
+        ]
+        v2_manager.finalize_job("job-1", "completed", None, runs)
+
+        names = lambda page: [run["agent_name"] for run in page]
+        assert names(v2_manager.get_agent_runs("job-1", 2)) == ["agent-3", "agent-4"]
+        assert names(v2_manager.get_agent_runs("job-1", 2, 2)) == ["agent-1", "agent-2"]
+        assert names(v2_manager.get_agent_runs("job-1")) == [f"agent-{i}" for i in range(5)]
+
+
+class TestV2JobProgress:
+    """Progress reported by the V2 job status endpoint"""
+
+    @pytest.fixture(autouse=True)
+    def install_manager(self, v2_manager, monkeypatch):
+        monkeypatch.setattr(v2.app.state, "job_manager", v2_manager, raising=False)
+
+    def test_finished_job_reports_full_progress_after_early_stop(self, v2_manager):
+        v2_manager.create_job("job-1", {}, expected_agent_count=8)
+        v2_manager.start_job("job-1")
+        v2_manager.finalize_job("job-1", "completed", {}, AGENT_RUNS[:2])
+        assert v2.get_job_status("job-1").progress == 100.0
+
+    def test_running_job_progress_is_capped(self, v2_manager):
+        v2_manager.create_job("job-1", {}, expected_agent_count=1)
+        v2_manager.start_job("job-1")
+        v2_manager._conn.executemany(v2._SQL_INSERT_AGENT_RUN, v2_manager._agent_run_rows("job-1", AGENT_RUNS[:2]))
+        status = v2.get_job_status("job-1")
+        assert status.status == "running"
+        assert status.progress == 100.0
+
+    def test_running_job_progress_counts_successful_runs(self, v2_manager):
+        v2_manager.create_job("job-1", {}, expected_agent_count=4)
+        v2_manager.start_job("job-1")
+        v2_manager._conn.executemany(v2._SQL_INSERT_AGENT_RUN, v2_manager._agent_run_rows("job-1", AGENT_RUNS))
+        assert v2.get_job_status("job-1").progress == 50.0
+
+
+class TestV2Enqueue:
+    """Handing created jobs to a pipeline queue that filled up meanwhile"""
+
+    @pytest.fixture(autouse=True)
+    def install_manager(self, v2_manager, monkeypatch):
+        monkeypatch.setattr(v2.app.state, "job_manager", v2_manager, raising=False)
+
+    def test_job_that_no_longer_fits_is_failed_with_503(self, v2_manager):
+        async def enqueue():
+            job_queue = asyncio.Queue(maxsize=1)
+            job_queue.put_nowait(("other", ()))
+            await v2.enqueue_job(job_queue, "job-1", ("work", ()))
+
+        v2_manager.create_job("job-1", {})
+        with pytest.raises(HTTPException) as raised:
+            asyncio.run(enqueue())
+        assert raised.value.status_code == 503
+        assert v2_manager.get_job_meta("job-1")["status"] == "failed"
+        assert v2_manager.start_job("job-1") is False
+
+
+class TestEnhancedJobManager:
+    """V3 job manager: the batched finalize write and its cached aggregates"""
+
+    def test_finalize_job_writes_runs_and_status_together(self, v3_manager):
+        v3_manager.create_job("job-1", {"population_size": 5})
+        v3_manager.finalize_job("job-1", "completed", {"patients": 5}, {"qa": {}}, [
+            {"agent_name": "cohort", "agent_role": "doer", "status": "success", "execution_time_ms": 10},
+            {"agent_name": "qa", "agent_role": "adversarial", "status": "failed", "execution_time_ms": 30},
+        ])
+
+        job = v3_manager.get_job("job-1")
+        assert job["status"] == "completed"
+        assert job["result_summary"] == {"patients": 5}
+        assert job["phase_results"] == {"qa": {}}
+        assert v3_manager.get_run_stats("job-1") == (2, 1, 20.0)
+
+    def test_finalize_job_invalidates_cached_aggregates(self, v3_manager):
+        v3_manager.create_job("job-1", {})
+        assert v3_manager.get_job_status_counts() == {"pending": 1}
+        assert v3_manager.get_role_performance() == []
+
+        v3_manager.finalize_job("job-1", "completed", None, None, [
+            {"agent_name": "cohort", "agent_role": "doer", "status": "success", "execution_time_ms": 10},
+        ])
+        assert v3_manager.get_job_status_counts() == {"completed": 1}
+        assert v3_manager.get_role_performance() == [("doer", 1, 10.0, 100.0)]
+
+
+class TestV3Enqueue:
+    """Handing created jobs to a full V3 pipeline queue"""
+
+    def test_job_that_no_longer_fits_is_failed_with_503(self, v3_manager, monkeypatch):
+        import integrated_server_v3_enhanced as v3
+        monkeypatch.setattr(v3, "enhanced_job_manager", v3_manager)
+
+        async def enqueue():
+            job_queue = asyncio.Queue(maxsize=1)
+            job_queue.put_nowait(("other", ()))
+            await v3.enqueue_job(job_queue, "job-1", ("work", ()))
+
+        v3_manager.create_job("job-1", {})
+        with pytest.raises(HTTPException) as raised:
+            asyncio.run(enqueue())
+        assert raised.value.status_code == 503
+        job = v3_manager.get_job("job-1")
+        assert job["status"] == "failed"
+        assert job["ended_at"] is not None
@@ -0,0 +1,62 @@
+"""
+Tests for the column-wise cohort store behind the MCP server tools
+"""
+
+import pytest
+
+pytest.importorskip("fastmcp")
+
+import mcp_server
+
+
+def _tool(tool):
+    """The plain function behind a registered MCP tool"""
+    return getattr(tool, "fn", tool)
+
+
+@pytest.fixture
+def cohort_id(monkeypatch):
+    monkeypatch.setattr(mcp_server, "generated_cohorts", {})
+    monkeypatch.setattr(mcp_server, "_cohort_index", [])
+    result = _tool(mcp_server.generate_synthetic_patients)(
+        population_size=50, conditions="diabetes,hypertension,asthma", age_min=20, age_max=90
+    )
+    return result["workflow_id"]
+
+
+class TestCohortStore:
+    """Patients materialized from columns, and counts computed on the codes"""
+
+    def test_export_materializes_every_patient(self, cohort_id):
+        export = _tool(mcp_server.get_cohort_details)(cohort_id)
+        patients = export["patients"]
+        assert len(patients) == 50 == export["metadata"]["total_patients"]
+        for patient in patients:
+            assert 20 <= patient["age"] <= 90
+            assert patient["gender"] in mcp_server._GENDERS
+            assert 1 <= len(patient["conditions"]) <= 3
+            assert len(set(patient["conditions"])) == len(patient["conditions"])
+            assert set(patient["conditions"]) <= {"diabetes", "hypertension", "asthma"}
+            assert isinstance(patient["vitals"]["heart_rate"], int)
+
+    def test_sample_is_a_prefix_of_the_export(self, cohort_id):
+        cohort = mcp_server.generated_cohorts[cohort_id]
+        assert mcp_server._cohort_patients(cohort, limit=3) == mcp_server._cohort_export(cohort)["patients"][:3]
+
+    def test_demographics_match_materialized_patients(self, cohort_id):
+        patients = _tool(mcp_server.get_cohort_details)(cohort_id)["patients"]
+        analysis = _tool(mcp_server.analyze_cohort_demographics)(cohort_id)
+
+        genders = analysis["demographics"]["gender_distribution"]
+        assert genders == {gender: sum(p["gender"] == gender for p in patients) for gender in mcp_server._GENDERS}
+        assert sum(analysis["demographics"]["age_distribution"].values()) == 50
+        conditions = analysis["clinical_characteristics"]["condition_frequency"]
+        assert sum(conditions.values()) == sum(len(p["conditions"]) for p in patients)
+        assert conditions["asthma"] == sum("asthma" in p["conditions"] for p in patients)
+
+    def test_cohort_without_conditions(self, monkeypatch):
+        monkeypatch.setattr(mcp_server, "generated_cohorts", {})
+        monkeypatch.setattr(mcp_server, "_cohort_index", [])
+        cohort_id = _tool(mcp_server.generate_synthetic_patients)(population_size=4)["workflow_id"]
+        patients = _tool(mcp_server.get_cohort_details)(cohort_id)["patients"]
+        assert [patient["conditions"] for patient in patients] == [[]] * 4
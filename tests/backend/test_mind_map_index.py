@@ -0,0 +1,38 @@
+"""
+Tests for the CSR adjacency index behind mind map subtree walks
+"""
+
+from agents.integrated.mind_map_orchestrator import MindMapIndex
+
+
+def _mind_map(children):
+    return {node_id: {"children": child_ids} for node_id, child_ids in children.items()}
+
+
+class TestMindMapIndex:
+    """Subtree walks in depth-first pre-order"""
+
+    def test_subtree_visits_children_in_declaration_order(self):
+        index = MindMapIndex(_mind_map({
+            "root": ["a", "b"],
+            "a": ["a1", "a2"],
+            "b": ["b1"],
+            "a1": [], "a2": [], "b1": [],
+        }))
+        assert index.subtree("root") == ["root", "a", "a1", "a2", "b", "b1"]
+        assert index.subtree("a") == ["a", "a1", "a2"]
+        assert index.subtree("b1") == ["b1"]
+
+    def test_shared_children_and_cycles_are_listed_once(self):
+        index = MindMapIndex(_mind_map({
+            "root": ["a", "b"],
+            "a": ["shared"],
+            "b": ["shared", "root"],
+            "shared": ["a"],
+        }))
+        assert index.subtree("root") == ["root", "a", "shared", "b"]
+
+    def test_unknown_ids_are_ignored(self):
+        index = MindMapIndex(_mind_map({"root": ["missing", "leaf"], "leaf": []}))
+        assert index.subtree("root") == ["root", "leaf"]
+        assert index.subtree("missing") == []